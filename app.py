@@ -1,5 +1,7 @@
 from flask import Flask, render_template, request, redirect, url_for, flash, jsonify
 import sqlite3
+import json
+import re
 from datetime import datetime, timedelta
 import os
 
@@ -9,6 +11,24 @@ app.secret_key = os.environ.get(
 )  # Use environment variable in production
 
 
+# Reserved dates are stored as YYYY-MM-DD
+_ISO_DATE_RE = re.compile(r"^\d{4}-\d{2}-\d{2}$")
+
+# Records one usage; the batch helper runs it through executemany, which
+# rejects statements that return rows
+_UPDATE_USAGE_SQL = """
+    UPDATE car_registrations 
+    SET last_usage_year = ?, usage_count = usage_count + 1, expiration_date = ?, is_active_in_period = ?
+    WHERE id = ?
+"""
+
+# The single-usage helper also hands back the stored values
+_RECORD_USAGE_SQL = (
+    _UPDATE_USAGE_SQL
+    + "    RETURNING last_usage_year, usage_count, expiration_date, is_active_in_period\n"
+)
+
+
 # Helper functions for 3-year rolling period system
 def calculate_expiration_date(reserved_date, last_usage_year=None):
     """
@@ -25,9 +45,14 @@ def calculate_expiration_date(reserved_date, last_usage_year=None):
     if not reserved_date:
         return None, False
 
+    # Reject malformed dates up front instead of via a parser exception
+    if not _ISO_DATE_RE.match(reserved_date):
+        print(f"⚠️  Error calculating expiration date: invalid date '{reserved_date}'")
+        return None, False
+
     try:
-        reserved_dt = datetime.strptime(reserved_date, "%Y-%m-%d")
-        reserved_year = reserved_dt.year
+        # fromisoformat validates the YYYY-MM-DD date far faster than strptime
+        reserved_year = datetime.fromisoformat(reserved_date).year
         current_year = datetime.now().year
 
         # Calculate original expiration date (3 years from reserved date)
@@ -85,19 +110,23 @@ def update_usage_for_registration(registration_id, usage_year=None):
     Args:
         registration_id (int): The registration ID
         usage_year (int): Usage year or None for current year
+
+    Returns:
+        tuple: Updated (last_usage_year, usage_count, expiration_date,
+        is_active_in_period), or False if the update failed
     """
     if usage_year is None:
         usage_year = datetime.now().year
 
     db_path = app.config.get("DATABASE", "car_numbers.db")
-    conn = sqlite3.connect(db_path)
+    conn = sqlite3.connect(db_path, uri=True)
     cursor = conn.cursor()
 
     try:
         # Get current registration info
         cursor.execute(
             """
-            SELECT reserved_date, last_usage_year, usage_count 
+            SELECT reserved_date 
             FROM car_registrations 
             WHERE id = ?
         """,
@@ -109,30 +138,90 @@ def update_usage_for_registration(registration_id, usage_year=None):
             print(f"❌ Registration {registration_id} not found")
             return False
 
-        reserved_date, current_last_usage_year, current_usage_count = result
-
-        # Update usage information
-        new_usage_count = current_usage_count + 1
+        reserved_date = result[0]
 
         # Calculate new expiration date
         expiration_date, is_active = calculate_expiration_date(
             reserved_date, usage_year
         )
 
-        # Update the record
+        # Update the record, incrementing usage_count in SQL, and hand back the
+        # stored values so callers need no follow-up SELECT
         cursor.execute(
-            """
-            UPDATE car_registrations 
-            SET last_usage_year = ?, usage_count = ?, expiration_date = ?, is_active_in_period = ?
-            WHERE id = ?
-        """,
-            (usage_year, new_usage_count, expiration_date, is_active, registration_id),
+            _RECORD_USAGE_SQL,
+            (usage_year, expiration_date, is_active, registration_id),
         )
+        updated = cursor.fetchone()
 
         conn.commit()
         print(
             f"✅ Updated usage for registration {registration_id} (year: {usage_year})"
         )
+        return updated
+
+    except Exception as e:
+        print(f"❌ Error updating usage: {e}")
+        conn.rollback()
+        return False
+
+    finally:
+        conn.close()
+
+
+def update_usage_for_registrations(usages):
+    """
+    Record several usages in a single transaction
+
+    Args:
+        usages (iterable): (registration_id, usage_year) pairs, applied in order;
+            a usage_year of None means the current year
+
+    Returns:
+        bool: True if every usage was recorded, False if any registration is
+        unknown or the update failed (nothing is recorded)
+    """
+    current_year = datetime.now().year
+    usages = [
+        (registration_id, current_year if usage_year is None else usage_year)
+        for registration_id, usage_year in usages
+    ]
+    if not usages:
+        return True
+
+    db_path = app.config.get("DATABASE", "car_numbers.db")
+    conn = sqlite3.connect(db_path, uri=True)
+    cursor = conn.cursor()
+
+    try:
+        # Get the reserved date of every registration involved in one query
+        registration_ids = {registration_id for registration_id, _ in usages}
+        cursor.execute(
+            f"""
+            SELECT id, reserved_date 
+            FROM car_registrations 
+            WHERE id IN ({', '.join('?' * len(registration_ids))})
+        """,
+            tuple(registration_ids),
+        )
+        reserved_dates = dict(cursor.fetchall())
+
+        missing = registration_ids - reserved_dates.keys()
+        if missing:
+            print(f"❌ Registrations {sorted(missing)} not found")
+            return False
+
+        rows = []
+        for registration_id, usage_year in usages:
+            expiration_date, is_active = calculate_expiration_date(
+                reserved_dates[registration_id], usage_year
+            )
+            rows.append((usage_year, expiration_date, is_active, registration_id))
+
+        # Apply every update with one prepared statement and a single commit
+        cursor.executemany(_UPDATE_USAGE_SQL, rows)
+
+        conn.commit()
+        print(f"✅ Recorded {len(rows)} usages")
         return True
 
     except Exception as e:
@@ -150,9 +239,13 @@ def remove_usage_for_registration(registration_id):
 
     Args:
         registration_id (int): The registration ID
+
+    Returns:
+        tuple: Updated (last_usage_year, usage_count, expiration_date,
+        is_active_in_period), or False if the update failed
     """
     db_path = app.config.get("DATABASE", "car_numbers.db")
-    conn = sqlite3.connect(db_path)
+    conn = sqlite3.connect(db_path, uri=True)
     cursor = conn.cursor()
 
     try:
@@ -182,13 +275,15 @@ def remove_usage_for_registration(registration_id):
             UPDATE car_registrations 
             SET last_usage_year = NULL, usage_count = 0, expiration_date = ?, is_active_in_period = ?
             WHERE id = ?
+            RETURNING last_usage_year, usage_count, expiration_date, is_active_in_period
         """,
             (expiration_date, is_active, registration_id),
         )
+        updated = cursor.fetchone()
 
         conn.commit()
         print(f"✅ Removed usage for registration {registration_id}")
-        return True
+        return updated
 
     except Exception as e:
         print(f"❌ Error removing usage: {e}")
@@ -201,7 +296,7 @@ def remove_usage_for_registration(registration_id):
 
 # Database initialization
 def init_db(db_path="car_numbers.db"):
-    conn = sqlite3.connect(db_path)
+    conn = sqlite3.connect(db_path, uri=True)
     cursor = conn.cursor()
     cursor.execute(
         """
@@ -228,6 +323,12 @@ def init_db(db_path="car_numbers.db"):
         )
     """
     )
+    # Matches the ORDER BY sort_order, car_number used by every listing, so
+    # SQLite walks the index in order instead of sorting in a temp B-tree
+    cursor.execute(
+        "CREATE INDEX IF NOT EXISTS idx_sort_order_car_number "
+        "ON car_registrations(sort_order, car_number)"
+    )
     conn.commit()
     conn.close()
 
@@ -246,7 +347,7 @@ def search():
 
     # Use configured database path or default
     db_path = app.config.get("DATABASE", "car_numbers.db")
-    conn = sqlite3.connect(db_path)
+    conn = sqlite3.connect(db_path, uri=True)
     cursor = conn.cursor()
 
     if status:
@@ -490,7 +591,7 @@ def add_registration():
 
         # Use configured database path or default
         db_path = app.config.get("DATABASE", "car_numbers.db")
-        conn = sqlite3.connect(db_path)
+        conn = sqlite3.connect(db_path, uri=True)
         cursor = conn.cursor()
 
         # Check if car number is already taken
@@ -556,7 +657,7 @@ def add_registration():
 def edit_registration(id):
     # Use configured database path or default
     db_path = app.config.get("DATABASE", "car_numbers.db")
-    conn = sqlite3.connect(db_path)
+    conn = sqlite3.connect(db_path, uri=True)
     cursor = conn.cursor()
 
     if request.method == "POST":
@@ -667,7 +768,7 @@ def edit_registration(id):
 def delete_registration(id):
     # Use configured database path or default
     db_path = app.config.get("DATABASE", "car_numbers.db")
-    conn = sqlite3.connect(db_path)
+    conn = sqlite3.connect(db_path, uri=True)
     cursor = conn.cursor()
 
     cursor.execute(
@@ -694,7 +795,7 @@ def delete_registration(id):
 def check_number(number):
     # Use configured database path or default
     db_path = app.config.get("DATABASE", "car_numbers.db")
-    conn = sqlite3.connect(db_path)
+    conn = sqlite3.connect(db_path, uri=True)
     cursor = conn.cursor()
     # Convert to string and pad with leading zeros
     search_number = str(number).zfill(3)
@@ -810,32 +911,29 @@ def export_data():
     try:
         # Use configured database path or default
         db_path = app.config.get("DATABASE", "car_numbers.db")
-        conn = sqlite3.connect(db_path)
+        conn = sqlite3.connect(db_path, uri=True)
         cursor = conn.cursor()
 
-        # Get all registrations
-        cursor.execute("SELECT * FROM car_registrations")
-        rows = cursor.fetchall()
-
-        # Get column names
-        columns = [description[0] for description in cursor.description]
-
-        # Convert to list of dictionaries
-        registrations = []
-        for row in rows:
-            registration = dict(zip(columns, row))
-            registrations.append(registration)
-
-        # Create export data structure
-        export_data = {
-            "export_date": datetime.now().isoformat(),
-            "total_registrations": len(registrations),
-            "registrations": registrations,
-        }
+        # Have SQLite build the whole export document itself rather than
+        # materialising a dict per row and re-encoding them all in Python.
+        # Column names are bound as the JSON keys and quoted as identifiers.
+        cursor.execute("SELECT name FROM pragma_table_info('car_registrations')")
+        columns = [name for (name,) in cursor.fetchall()]
+        fields = ", ".join(
+            "?, " + '"' + name.replace('"', '""') + '"' for name in columns
+        )
+        cursor.execute(
+            "SELECT json_object('export_date', ?, "
+            "'total_registrations', COUNT(*), "
+            f"'registrations', json_group_array(json_object({fields}))) "
+            "FROM car_registrations",
+            (datetime.now().isoformat(), *columns),
+        )
+        (export_json,) = cursor.fetchone()
 
         conn.close()
 
-        return jsonify(export_data)
+        return app.response_class(export_json, mimetype="application/json")
 
     except Exception as e:
         return jsonify({"error": str(e)}), 500
@@ -845,7 +943,7 @@ def export_data():
 def stats():
     # Use configured database path or default
     db_path = app.config.get("DATABASE", "car_numbers.db")
-    conn = sqlite3.connect(db_path)
+    conn = sqlite3.connect(db_path, uri=True)
     cursor = conn.cursor()
 
     # Total registrations
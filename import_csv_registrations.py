@@ -15,6 +15,15 @@ sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
 from app import calculate_expiration_date, init_db
 
+# Single INSERT text shared by every imported row, bound once via executemany
+INSERT_REGISTRATION_SQL = """
+    INSERT INTO car_registrations 
+    (first_name, last_name, car_number, sort_order, car_make, car_model, car_year, 
+     car_color, reserved_date, notes, status, last_usage_year, expiration_date, 
+     usage_count, is_active_in_period)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
 
 def import_csv_registrations(csv_file_path):
     """
@@ -43,7 +52,15 @@ def import_csv_registrations(csv_file_path):
     print("🚀 Starting CSV import for Nord Stern Car Numbers")
     print("=" * 60)
 
+    # (row number, registration) pairs to insert, handed to executemany in one
+    # call after parsing
+    rows = []
+
     try:
+        # Car numbers already taken, tracked in memory instead of a SELECT per row
+        cursor.execute("SELECT car_number FROM car_registrations")
+        existing_numbers = {car_number for (car_number,) in cursor}
+
         with open(csv_file_path, "r", encoding="utf-8") as csvfile:
             # Try to detect the delimiter
             sample = csvfile.read(1024)
@@ -113,16 +130,12 @@ def import_csv_registrations(csv_file_path):
 
                     # Note: Allowing duplicates - user will manually manage them in the app
                     # Check if car number already exists (for informational purposes only)
-                    cursor.execute(
-                        "SELECT id FROM car_registrations WHERE car_number = ?",
-                        (car_number,),
-                    )
-                    existing = cursor.fetchone()
-                    if existing:
+                    if car_number in existing_numbers:
                         print(
                             f"⚠️  Row {row_num}: Duplicate car number {car_number} - importing anyway"
                         )
                         # Don't increment skipped_duplicate since we're allowing them
+                    existing_numbers.add(car_number)
 
                     # Process reserved date and handle "Retired" status
                     status = "Active"  # Default status
@@ -220,41 +233,53 @@ def import_csv_registrations(csv_file_path):
                     except ValueError:
                         sort_order = 0
 
-                    # Insert the registration
-                    cursor.execute(
-                        """
-                        INSERT INTO car_registrations 
-                        (first_name, last_name, car_number, sort_order, car_make, car_model, car_year, 
-                         car_color, reserved_date, notes, status, last_usage_year, expiration_date, 
-                         usage_count, is_active_in_period)
-                        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                    """,
+                    # Queue the registration for the batch insert
+                    rows.append(
                         (
-                            first_name,
-                            last_name,
-                            car_number,
-                            sort_order,
-                            car_make,
-                            car_model,
-                            car_year_int,
-                            car_color,
-                            reserved_date,
-                            notes,
-                            status,
-                            last_usage_year,
-                            expiration_date,
-                            usage_count,
-                            is_active_in_period,
-                        ),
+                            row_num,
+                            (
+                                first_name,
+                                last_name,
+                                car_number,
+                                sort_order,
+                                car_make,
+                                car_model,
+                                car_year_int,
+                                car_color,
+                                reserved_date,
+                                notes,
+                                status,
+                                last_usage_year,
+                                expiration_date,
+                                usage_count,
+                                is_active_in_period,
+                            ),
+                        )
                     )
 
-                    stats["imported"] += 1
-
                 except Exception as e:
                     print(f"❌ Row {row_num}: Error processing row - {str(e)}")
                     stats["errors"] += 1
                     continue
 
+        # Insert every parsed registration with one prepared statement; if the
+        # database rejects any of them, redo the inserts row by row so only the
+        # rejected rows are lost
+        try:
+            cursor.executemany(
+                INSERT_REGISTRATION_SQL, [registration for _, registration in rows]
+            )
+            stats["imported"] = cursor.rowcount
+        except sqlite3.Error:
+            conn.rollback()
+            for row_num, registration in rows:
+                try:
+                    cursor.execute(INSERT_REGISTRATION_SQL, registration)
+                    stats["imported"] += cursor.rowcount
+                except sqlite3.Error as e:
+                    print(f"❌ Row {row_num}: Error inserting row - {str(e)}")
+                    stats["errors"] += 1
+
         # Commit all changes
         conn.commit()
 
@@ -9,6 +9,15 @@ import sqlite3
 import re
 from datetime import datetime
 
+# Single canonical INSERT text so sqlite3's per-connection statement cache hits.
+# OR IGNORE lets SQLite drop duplicate car numbers without raising into Python.
+INSERT_REGISTRATION_SQL = (
+    "INSERT OR IGNORE INTO car_registrations "
+    "(first_name, last_name, car_number, car_make, car_model, car_year, car_color, "
+    "status, reserved_date) "
+    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)"
+)
+
 
 def clean_name(name):
     """Clean and parse driver names from the Excel format."""
@@ -99,18 +108,28 @@ def import_excel_data():
     imported_count = 0
     skipped_count = 0
 
+    # Normalise the trailing car-info columns once, up front, rather than
+    # calling pd.isna()/str()/strip() on every cell inside the row loop
+    car_info = df.iloc[:, -10:]
+    car_info = (
+        car_info.astype("string")
+        .where(car_info.notna(), "")
+        .apply(lambda column: column.str.strip())
+        .to_numpy()
+    )
+
     # Process each row
-    for index, row in df.iterrows():
+    for row, car_cells in zip(df.itertuples(index=False, name=None), car_info):
         # Skip header rows and empty rows
-        if pd.isna(row.iloc[0]) or str(row.iloc[0]).strip() == "":
+        if pd.isna(row[0]) or str(row[0]).strip() == "":
             continue
 
         # Skip the header row
-        if "Fullname Key" in str(row.iloc[0]):
+        if "Fullname Key" in str(row[0]):
             continue
 
         # Get driver name from first column
-        driver_name = row.iloc[0]
+        driver_name = row[0]
         first_name, last_name = clean_name(driver_name)
 
         if not first_name or not last_name:
@@ -118,14 +137,14 @@ def import_excel_data():
             continue
 
         # Extract car number from the second column (Driver(#) Key)
-        driver_key = row.iloc[1]
+        driver_key = row[1]
         car_number = extract_car_number(driver_key)
         if car_number is None:
             skipped_count += 1
             continue
 
         # Check if reserved for 2025 (column 3)
-        reserved_2025 = row.iloc[2]
+        reserved_2025 = row[2]
         status = "Active"
         if pd.notna(reserved_2025) and str(reserved_2025).strip().lower() == "retired":
             status = "Retired"
@@ -137,46 +156,40 @@ def import_excel_data():
         car_color = None
 
         # Look for car information in the last few columns
-        for col_idx in range(len(row) - 10, len(row)):
-            if pd.notna(row.iloc[col_idx]):
-                cell_value = str(row.iloc[col_idx]).strip()
-                if cell_value and cell_value != "nan":
-                    # Try to identify car make, model, year, color
-                    if not car_make and any(
-                        brand in cell_value.lower()
-                        for brand in [
-                            "bmw",
-                            "porsche",
-                            "audi",
-                            "mercedes",
-                            "ferrari",
-                            "lamborghini",
-                            "toyota",
-                            "honda",
-                            "ford",
-                            "chevrolet",
-                        ]
-                    ):
-                        car_make = cell_value
-                    elif not car_model and len(cell_value) <= 10:
-                        car_model = cell_value
-                    elif (
-                        not car_year
-                        and cell_value.isdigit()
-                        and 1900 <= int(cell_value) <= 2030
-                    ):
-                        car_year = int(cell_value)
-                    elif not car_color and len(cell_value) <= 15:
-                        car_color = cell_value
+        for cell_value in car_cells:
+            if cell_value and cell_value != "nan":
+                # Try to identify car make, model, year, color
+                if not car_make and any(
+                    brand in cell_value.lower()
+                    for brand in [
+                        "bmw",
+                        "porsche",
+                        "audi",
+                        "mercedes",
+                        "ferrari",
+                        "lamborghini",
+                        "toyota",
+                        "honda",
+                        "ford",
+                        "chevrolet",
+                    ]
+                ):
+                    car_make = cell_value
+                elif not car_model and len(cell_value) <= 10:
+                    car_model = cell_value
+                elif (
+                    not car_year
+                    and cell_value.isdigit()
+                    and 1900 <= int(cell_value) <= 2030
+                ):
+                    car_year = int(cell_value)
+                elif not car_color and len(cell_value) <= 15:
+                    car_color = cell_value
 
         # Insert into database
         try:
             cursor.execute(
-                """
-                INSERT INTO car_registrations 
-                (first_name, last_name, car_number, car_make, car_model, car_year, car_color, status, reserved_date)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """,
+                INSERT_REGISTRATION_SQL,
                 (
                     first_name,
                     last_name,
@@ -190,12 +203,14 @@ def import_excel_data():
                 ),
             )
 
-            imported_count += 1
-            print(f"Imported: {first_name} {last_name} - Car #{car_number}")
+            # rowcount is 0 when the UNIQUE car_number caused the row to be ignored
+            if cursor.rowcount:
+                imported_count += 1
+                print(f"Imported: {first_name} {last_name} - Car #{car_number}")
+            else:
+                print(f"Skipped {first_name} {last_name}: duplicate car #{car_number}")
+                skipped_count += 1
 
-        except sqlite3.IntegrityError as e:
-            print(f"Error importing {first_name} {last_name}: {e}")
-            skipped_count += 1
         except Exception as e:
             print(f"Error importing {first_name} {last_name}: {e}")
             skipped_count += 1
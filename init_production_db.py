@@ -8,62 +8,113 @@ import sqlite3
 import json
 import os
 import sys
+import itertools
+import operator
 from datetime import datetime
 
+try:
+    import ijson  # Optional: streams large JSON exports instead of loading them whole
+except ImportError:
+    ijson = None
+
+# Number of rows handed to executemany() per batch during JSON imports
+IMPORT_BATCH_SIZE = 10000
+
+# Registration fields in car_registrations column order, as found in JSON exports
+REGISTRATION_COLUMNS = (
+    "id",
+    "first_name",
+    "last_name",
+    "car_number",
+    "sort_order",
+    "car_make",
+    "car_model",
+    "car_year",
+    "car_color",
+    "reserved_date",
+    "reserved_for_year",
+    "status",
+    "notes",
+    "last_usage_year",
+    "expiration_date",
+    "usage_count",
+    "is_active_in_period",
+    "created_at",
+    "updated_at",
+)
+
+# Single canonical INSERT text so sqlite3's per-connection statement cache hits
+INSERT_REGISTRATION_SQL = (
+    f"INSERT INTO car_registrations ({', '.join(REGISTRATION_COLUMNS)}) "
+    f"VALUES ({', '.join('?' * len(REGISTRATION_COLUMNS))})"
+)
+
+# Pulls one export dict into an INSERT parameter tuple in a single C-level call
+_registration_row = operator.itemgetter(*REGISTRATION_COLUMNS)
+
+
+def create_schema(cursor):
+    """Create the car_registrations table if it does not already exist"""
+    cursor.execute(
+        """
+        CREATE TABLE IF NOT EXISTS car_registrations (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            first_name TEXT NOT NULL,
+            last_name TEXT NOT NULL,
+            car_number TEXT NOT NULL,
+            sort_order INTEGER,
+            car_make TEXT,
+            car_model TEXT,
+            car_year INTEGER,
+            car_color TEXT,
+            reserved_date TEXT,
+            reserved_for_year INTEGER,
+            status TEXT DEFAULT 'Active',
+            notes TEXT,
+            last_usage_year INTEGER,
+            expiration_date TEXT,
+            usage_count INTEGER DEFAULT 0,
+            is_active_in_period BOOLEAN DEFAULT 1,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """
+    )
+
+
+def create_indexes(cursor):
+    """Create the car_registrations lookup indexes if they do not already exist"""
+    cursor.execute(
+        "CREATE INDEX IF NOT EXISTS idx_car_number ON car_registrations(car_number)"
+    )
+    cursor.execute(
+        "CREATE INDEX IF NOT EXISTS idx_sort_order ON car_registrations(sort_order)"
+    )
+    cursor.execute(
+        "CREATE INDEX IF NOT EXISTS idx_name ON car_registrations(first_name, last_name)"
+    )
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_status ON car_registrations(status)")
+    cursor.execute(
+        "CREATE INDEX IF NOT EXISTS idx_sort_order_car_number "
+        "ON car_registrations(sort_order, car_number)"
+    )
+
 
 def init_production_database(db_path, data_file=None):
     """Initialize production database with schema and optionally data"""
 
     print(f"🚀 Initializing production database: {db_path}")
 
-    # Create database connection
-    conn = sqlite3.connect(db_path)
+    # Create database connection; uri=True also accepts file: URIs
+    conn = sqlite3.connect(db_path, uri=True)
     cursor = conn.cursor()
 
     try:
         # Create the database schema
         print("📋 Creating database schema...")
 
-        cursor.execute(
-            """
-            CREATE TABLE IF NOT EXISTS car_registrations (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                first_name TEXT NOT NULL,
-                last_name TEXT NOT NULL,
-                car_number TEXT NOT NULL,
-                sort_order INTEGER,
-                car_make TEXT,
-                car_model TEXT,
-                car_year INTEGER,
-                car_color TEXT,
-                reserved_date TEXT,
-                reserved_for_year INTEGER,
-                status TEXT DEFAULT 'Active',
-                notes TEXT,
-                last_usage_year INTEGER,
-                expiration_date TEXT,
-                usage_count INTEGER DEFAULT 0,
-                is_active_in_period BOOLEAN DEFAULT 1,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        """
-        )
-
-        # Create indexes for better performance
-        cursor.execute(
-            "CREATE INDEX IF NOT EXISTS idx_car_number ON car_registrations(car_number)"
-        )
-        cursor.execute(
-            "CREATE INDEX IF NOT EXISTS idx_sort_order ON car_registrations(sort_order)"
-        )
-        cursor.execute(
-            "CREATE INDEX IF NOT EXISTS idx_name ON car_registrations(first_name, last_name)"
-        )
-        cursor.execute(
-            "CREATE INDEX IF NOT EXISTS idx_status ON car_registrations(status)"
-        )
-
+        create_schema(cursor)
+        create_indexes(cursor)
         conn.commit()
         print("✅ Database schema created successfully")
 
@@ -72,8 +123,13 @@ def init_production_database(db_path, data_file=None):
             print(f"📊 IMPORTING DATA: Found data file {data_file}")
             print("   ⚠️  This will CLEAR existing production data and load new data")
 
-            # Clear existing data first (only when importing new data)
-            cursor.execute("DELETE FROM car_registrations")
+            # Rebuild the table instead of deleting row by row: DROP avoids
+            # per-row delete and index churn, and the indexes are built once
+            # after the load. It all runs in one transaction so a failed
+            # import leaves the existing data in place.
+            cursor.execute("BEGIN")
+            cursor.execute("DROP TABLE IF EXISTS car_registrations")
+            create_schema(cursor)
             print("   ✅ Cleared existing production data")
 
             if data_file.endswith(".json"):
@@ -85,9 +141,14 @@ def init_production_database(db_path, data_file=None):
                 success = False
 
             if success:
+                create_indexes(cursor)
+                # Gather planner statistics for the freshly loaded table so
+                # queries pick the right index from the first request
+                cursor.execute("ANALYZE")
                 conn.commit()
                 print("✅ Data imported successfully")
             else:
+                conn.rollback()
                 print("❌ Data import failed")
                 return False
         else:
@@ -112,48 +173,32 @@ def init_production_database(db_path, data_file=None):
         conn.close()
 
 
+def _iter_json_registrations(json_file):
+    """Yield registrations from a JSON export, streaming them when ijson is available"""
+    if ijson is not None:
+        with open(json_file, "rb") as f:
+            yield from ijson.items(f, "registrations.item", use_float=True)
+    else:
+        with open(json_file, "r") as f:
+            data = json.load(f)
+        yield from data.get("registrations", [])
+
+
 def import_from_json(cursor, json_file):
     """Import data from JSON file"""
     try:
-        with open(json_file, "r") as f:
-            data = json.load(f)
+        rows = map(_registration_row, _iter_json_registrations(json_file))
 
-        registrations = data.get("registrations", [])
-
-        for reg in registrations:
-            cursor.execute(
-                """
-                INSERT INTO car_registrations 
-                (id, first_name, last_name, car_number, sort_order, car_make, car_model, 
-                 car_year, car_color, reserved_date, reserved_for_year, status, notes, 
-                 last_usage_year, expiration_date, usage_count, is_active_in_period, 
-                 created_at, updated_at)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """,
-                (
-                    reg["id"],
-                    reg["first_name"],
-                    reg["last_name"],
-                    reg["car_number"],
-                    reg["sort_order"],
-                    reg["car_make"],
-                    reg["car_model"],
-                    reg["car_year"],
-                    reg["car_color"],
-                    reg["reserved_date"],
-                    reg["reserved_for_year"],
-                    reg["status"],
-                    reg["notes"],
-                    reg["last_usage_year"],
-                    reg["expiration_date"],
-                    reg["usage_count"],
-                    reg["is_active_in_period"],
-                    reg["created_at"],
-                    reg["updated_at"],
-                ),
-            )
-
-        print(f"   Imported {len(registrations)} registrations from JSON")
+        # Insert in fixed-size batches so memory stays bounded for large exports
+        imported_count = 0
+        while True:
+            batch = list(itertools.islice(rows, IMPORT_BATCH_SIZE))
+            if not batch:
+                break
+            cursor.executemany(INSERT_REGISTRATION_SQL, batch)
+            imported_count += len(batch)
+
+        print(f"   Imported {imported_count} registrations from JSON")
         return True
 
     except Exception as e:
@@ -68,17 +68,19 @@ def migrate_database():
         cursor.execute("SELECT id, reserved_date, status FROM car_registrations")
         registrations = cursor.fetchall()
 
+        # Evaluate "now" once so every record is judged against the same instant
+        current_date = datetime.now()
+
         for reg_id, reserved_date, status in registrations:
             if reserved_date:
                 # Parse the reserved date
                 try:
-                    reserved_dt = datetime.strptime(reserved_date, "%Y-%m-%d")
+                    reserved_dt = datetime.fromisoformat(reserved_date)
 
                     # Calculate expiration date (3 years from reserved date)
                     expiration_dt = reserved_dt + timedelta(days=3 * 365)
 
                     # Check if the registration is still active in the current period
-                    current_date = datetime.now()
                     is_active = (current_date <= expiration_dt) and (status == "Active")
 
                     # Update the record
@@ -142,12 +144,12 @@ def calculate_expiration_date(reserved_date, last_usage_date=None):
         tuple: (expiration_date, is_active_in_period)
     """
     try:
-        reserved_dt = datetime.strptime(reserved_date, "%Y-%m-%d")
+        reserved_dt = datetime.fromisoformat(reserved_date)
         current_date = datetime.now()
 
         if last_usage_date:
             # If there's usage, calculate from the last usage date
-            last_usage_dt = datetime.strptime(last_usage_date, "%Y-%m-%d")
+            last_usage_dt = datetime.fromisoformat(last_usage_date)
             expiration_dt = last_usage_dt + timedelta(days=3 * 365)
         else:
             # If no usage, calculate from the original reserved date
@@ -163,20 +165,24 @@ def calculate_expiration_date(reserved_date, last_usage_date=None):
         return None, False
 
 
-def update_usage_for_registration(registration_id, usage_date=None):
+def update_usage_for_registration(registration_id, usage_date=None, cursor=None):
     """
     Update usage information for a registration
 
     Args:
         registration_id (int): The registration ID
         usage_date (str): Usage date (YYYY-MM-DD) or None for current date
+        cursor (sqlite3.Cursor): Optional cursor to reuse; the caller then owns
+            the connection and is responsible for committing
     """
     if usage_date is None:
         usage_date = datetime.now().strftime("%Y-%m-%d")
 
-    db_path = "car_numbers.db"
-    conn = sqlite3.connect(db_path)
-    cursor = conn.cursor()
+    owns_connection = cursor is None
+    if owns_connection:
+        db_path = "car_numbers.db"
+        conn = sqlite3.connect(db_path)
+        cursor = conn.cursor()
 
     try:
         # Get current registration info
@@ -214,17 +220,20 @@ def update_usage_for_registration(registration_id, usage_date=None):
             (usage_date, new_usage_count, expiration_date, is_active, registration_id),
         )
 
-        conn.commit()
+        if owns_connection:
+            conn.commit()
         print(f"✅ Updated usage for registration {registration_id}")
         return True
 
     except Exception as e:
         print(f"❌ Error updating usage: {e}")
-        conn.rollback()
+        if owns_connection:
+            conn.rollback()
         return False
 
     finally:
-        conn.close()
+        if owns_connection:
+            conn.close()
 
 
 if __name__ == "__main__":
@@ -24,7 +24,9 @@ def migrate_usage_to_year():
     print("🔄 Nord Stern Car Numbers - Usage Migration to Year-Based System")
     print("=" * 60)
 
-    conn = sqlite3.connect(db_path)
+    # Manage the transaction explicitly so the whole migration commits once
+    conn = sqlite3.connect(db_path, isolation_level=None)
+    conn.execute("PRAGMA synchronous=NORMAL")
     cursor = conn.cursor()
 
     try:
@@ -37,6 +39,7 @@ def migrate_usage_to_year():
             return True
 
         print("📋 Starting migration...")
+        cursor.execute("BEGIN IMMEDIATE")
 
         # Add new column for year-based usage
         print("➕ Adding last_usage_year column...")
@@ -53,50 +56,38 @@ def migrate_usage_to_year():
             """
             UPDATE car_registrations 
             SET last_usage_year = CAST(strftime('%Y', last_usage_date) AS INTEGER)
-            WHERE last_usage_date IS NOT NULL
+            WHERE strftime('%Y', last_usage_date) IS NOT NULL
         """
         )
+        # Every converted row now has a usage year; reuse it for the summary
+        with_usage = cursor.rowcount
 
-        # Update expiration dates based on new year-based system
+        # Update expiration dates based on new year-based system.
+        # Expiration is 3 years from the last usage year, or from the reserved
+        # year when there is no usage; computed for every row in one statement.
         print("📅 Recalculating expiration dates...")
+        current_year = datetime.now().year
         cursor.execute(
-            "SELECT id, reserved_date, last_usage_year FROM car_registrations"
+            """
+            UPDATE car_registrations
+            SET expiration_date = printf(
+                    '%d-01-01',
+                    COALESCE(
+                        NULLIF(last_usage_year, 0),
+                        CAST(strftime('%Y', reserved_date) AS INTEGER)
+                    ) + 3
+                ),
+                is_active_in_period = (
+                    ? <= COALESCE(
+                        NULLIF(last_usage_year, 0),
+                        CAST(strftime('%Y', reserved_date) AS INTEGER)
+                    ) + 3
+                )
+            WHERE strftime('%Y', reserved_date) IS NOT NULL
+        """,
+            (current_year,),
         )
-        registrations = cursor.fetchall()
-
-        updated_count = 0
-        for reg_id, reserved_date, last_usage_year in registrations:
-            if reserved_date:
-                try:
-                    reserved_dt = datetime.strptime(reserved_date, "%Y-%m-%d")
-                    reserved_year = reserved_dt.year
-
-                    if last_usage_year:
-                        # If there's usage, expiration is 3 years from usage year
-                        expiration_year = last_usage_year + 3
-                    else:
-                        # If no usage, expiration is 3 years from reserved year
-                        expiration_year = reserved_year + 3
-
-                    expiration_date = f"{expiration_year}-01-01"
-
-                    # Check if still active (current year <= expiration year)
-                    current_year = datetime.now().year
-                    is_active = current_year <= expiration_year
-
-                    cursor.execute(
-                        """
-                        UPDATE car_registrations 
-                        SET expiration_date = ?, is_active_in_period = ?
-                        WHERE id = ?
-                    """,
-                        (expiration_date, is_active, reg_id),
-                    )
-
-                    updated_count += 1
-
-                except ValueError as e:
-                    print(f"⚠️  Error processing registration {reg_id}: {e}")
+        updated_count = cursor.rowcount
 
         print(f"✅ Updated {updated_count} expiration dates")
 
@@ -105,11 +96,6 @@ def migrate_usage_to_year():
         print("💾 Migration completed successfully!")
 
         # Show summary
-        cursor.execute(
-            "SELECT COUNT(*) FROM car_registrations WHERE last_usage_year IS NOT NULL"
-        )
-        with_usage = cursor.fetchone()[0]
-
         cursor.execute("SELECT COUNT(*) FROM car_registrations")
         total = cursor.fetchone()[0]
 
@@ -4,19 +4,58 @@ Comprehensive test runner for Nord Stern Car Numbers
 Includes code formatting (Black) and linting (flake8) checks
 """
 
+import importlib.util
+import shlex
 import subprocess
 import sys
 import os
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
-
-def run_command(command, description, exit_on_failure=True):
-    """Run a command and handle the result"""
+# Tools run as modules of this interpreter, matching the check_dependencies probes
+BLACK_COMMAND = [sys.executable, "-m", "black", "--check", "--diff", "."]
+FLAKE8_COMMAND = [
+    sys.executable,
+    "-m",
+    "flake8",
+    ".",
+    "--count",
+    "--select=E9,F63,F7,F82",
+    "--show-source",
+    "--statistics",
+]
+# One pytest run produces both the test results and the coverage report
+PYTEST_COMMAND = [
+    sys.executable,
+    "-m",
+    "pytest",
+    "tests/",
+    "-v",
+    "--cov=.",
+    "--cov-report=term-missing",
+    "--cov-report=html",
+]
+
+
+def start_command(executor, argv):
+    """Launch a command in the background and return its future"""
+    return executor.submit(subprocess.run, argv, capture_output=True, text=True)
+
+
+def run_command(argv, description, exit_on_failure=True, future=None):
+    """Run a command (given as an argv list, no shell) and handle the result
+
+    If future is from start_command for argv, its result is reported instead
+    of running the command again.
+    """
     print(f"\n🔍 {description}...")
-    print(f"   Running: {command}")
+    print(f"   Running: {shlex.join(argv)}")
 
     try:
-        result = subprocess.run(command, shell=True, capture_output=True, text=True)
+        if future is not None:
+            result = future.result()
+        else:
+            result = subprocess.run(argv, capture_output=True, text=True)
 
         if result.returncode == 0:
             print(f"   ✅ {description} passed")
@@ -45,43 +84,35 @@ def check_dependencies():
     """Check if required tools are installed"""
     print("🔧 Checking dependencies...")
 
-    # Check Black
-    black_result = subprocess.run("black --version", shell=True, capture_output=True)
-    if black_result.returncode != 0:
-        print("❌ Black is not installed. Install with: pip install black")
-        return False
-
-    # Check flake8
-    flake8_result = subprocess.run("flake8 --version", shell=True, capture_output=True)
-    if flake8_result.returncode != 0:
-        print("❌ flake8 is not installed. Install with: pip install flake8")
-        return False
-
-    # Check pytest
-    pytest_result = subprocess.run("pytest --version", shell=True, capture_output=True)
-    if pytest_result.returncode != 0:
-        print("❌ pytest is not installed. Install with: pip install pytest")
-        return False
+    # Probe by import spec rather than spawning "<tool> --version" subprocesses
+    for module in ("black", "flake8", "pytest", "pytest_cov"):
+        if importlib.util.find_spec(module) is None:
+            print(f"❌ {module} is not installed. Install with: pip install {module}")
+            return False
 
     print("✅ All dependencies are installed")
     return True
 
 
-def run_quality_checks():
-    """Run code quality checks"""
+def run_quality_checks(black_future=None, flake8_future=None):
+    """Run code quality checks, reporting any runs already started"""
     print("\n🎨 Running Code Quality Checks")
     print("=" * 50)
 
     # Check Black formatting
     black_success = run_command(
-        "black --check --diff .", "Black code formatting check", exit_on_failure=False
+        BLACK_COMMAND,
+        "Black code formatting check",
+        exit_on_failure=False,
+        future=black_future,
     )
 
     # Run flake8 for critical issues only
     flake8_success = run_command(
-        "flake8 . --count --select=E9,F63,F7,F82 --show-source --statistics",
+        FLAKE8_COMMAND,
         "Flake8 critical linting check",
         exit_on_failure=False,
+        future=flake8_future,
     )
 
     if not black_success:
@@ -95,34 +126,23 @@ def run_quality_checks():
     return black_success and flake8_success
 
 
-def run_tests():
-    """Run the actual tests"""
+def run_tests(pytest_future=None):
+    """Run the actual tests, reporting a run already started"""
     print("\n🧪 Running Tests")
     print("=" * 50)
 
-    # Run tests with verbose output
+    # Run tests with verbose output and coverage
     test_success = run_command(
-        "python -m pytest tests/ -v", "Unit tests", exit_on_failure=True
-    )
-
-    return test_success
-
-
-def run_coverage():
-    """Run test coverage"""
-    print("\n📊 Running Test Coverage")
-    print("=" * 50)
-
-    coverage_success = run_command(
-        "python -m pytest tests/ --cov=. --cov-report=term-missing --cov-report=html",
-        "Test coverage report",
+        PYTEST_COMMAND,
+        "Unit tests with coverage",
         exit_on_failure=False,
+        future=pytest_future,
     )
 
-    if coverage_success:
+    if test_success:
         print("\n📁 Coverage report generated in htmlcov/index.html")
 
-    return coverage_success
+    return test_success
 
 
 def main():
@@ -135,14 +155,18 @@ def main():
         print("\n❌ Please install missing dependencies and try again")
         sys.exit(1)
 
-    # Run quality checks
-    quality_passed = run_quality_checks()
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        # Black, flake8 and pytest are independent, so start them all at once;
+        # results are still reported in order below as each one is collected
+        black_future = start_command(executor, BLACK_COMMAND)
+        flake8_future = start_command(executor, FLAKE8_COMMAND)
+        pytest_future = start_command(executor, PYTEST_COMMAND)
 
-    # Run tests
-    tests_passed = run_tests()
+        # Run quality checks
+        quality_passed = run_quality_checks(black_future, flake8_future)
 
-    # Run coverage
-    coverage_passed = run_coverage()
+        # Run tests
+        tests_passed = run_tests(pytest_future)
 
     # Summary
     print("\n" + "=" * 60)
@@ -150,7 +174,6 @@ def main():
     print("=" * 60)
     print(f"   Code Quality: {'✅ PASSED' if quality_passed else '❌ FAILED'}")
     print(f"   Unit Tests:   {'✅ PASSED' if tests_passed else '❌ FAILED'}")
-    print(f"   Coverage:     {'✅ PASSED' if coverage_passed else '❌ FAILED'}")
 
     if quality_passed and tests_passed:
         print("\n🎉 All critical checks passed!")
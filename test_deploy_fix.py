@@ -6,9 +6,27 @@ This script simulates the deployment process and checks if export files are incl
 
 import os
 import tempfile
-import shutil
-import subprocess
 import json
+import mmap
+import re
+
+# export_database.py writes total_registrations before the (large) registrations
+# list, so the count can be read straight from the mapped file without parsing it
+_TOTAL_REGISTRATIONS_RE = re.compile(rb'"total_registrations":\s*(\d+)')
+
+
+def read_registration_count(json_path):
+    """Return total_registrations from an export file without loading every row."""
+    with open(json_path, "rb") as f:
+        if os.fstat(f.fileno()).st_size:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                match = _TOTAL_REGISTRATIONS_RE.search(mm)
+                if match:
+                    return int(match.group(1))
+
+        # Unexpected layout: fall back to a full parse
+        f.seek(0)
+        return json.load(f).get("total_registrations", 0)
 
 
 def test_deploy_with_data_fix():
@@ -19,28 +37,19 @@ def test_deploy_with_data_fix():
     with tempfile.TemporaryDirectory() as temp_dir:
         print(f"   Created temporary directory: {temp_dir}")
 
-        # Copy application files (excluding export files)
-        print("   Copying application files...")
-        subprocess.run(
-            [
-                "rsync",
-                "-av",
-                "--exclude=database_export.*",
-                "--exclude=database_import.sql",
-                "--exclude=venv/",
-                "--exclude=.git/",
-                "--exclude=deploy_temp_*/",
-                ".",
-                temp_dir,
-            ],
-            check=True,
-        )
-
-        # Copy export files
-        print("   Copying export files...")
-        shutil.copy("database_export.json", temp_dir)
-        shutil.copy("database_export.csv", temp_dir)
-        shutil.copy("database_import.sql", temp_dir)
+        export_files = [
+            "database_export.json",
+            "database_export.csv",
+            "database_import.sql",
+        ]
+
+        # Only the export files and .gcloudignore are inspected below, so link
+        # them in instead of copying the whole application tree
+        print("   Linking export files...")
+        for file in export_files + [".gcloudignore"]:
+            src = os.path.abspath(file)
+            if os.path.exists(src):
+                os.symlink(src, os.path.join(temp_dir, file))
 
         # Check if .gcloudignore exists and rename it
         gcloudignore_path = os.path.join(temp_dir, ".gcloudignore")
@@ -48,18 +57,10 @@ def test_deploy_with_data_fix():
             print("   Temporarily renaming .gcloudignore...")
             os.rename(gcloudignore_path, gcloudignore_path + ".backup")
 
-        # Verify export files are present
-        export_files = [
-            "database_export.json",
-            "database_export.csv",
-            "database_import.sql",
-        ]
-
-        missing_files = []
-        for file in export_files:
-            file_path = os.path.join(temp_dir, file)
-            if not os.path.exists(file_path):
-                missing_files.append(file)
+        # Verify export files are present (one directory read, no per-file stat)
+        with os.scandir(temp_dir) as entries:
+            present = {entry.name for entry in entries}
+        missing_files = [file for file in export_files if file not in present]
 
         if missing_files:
             print(f"❌ Missing export files: {missing_files}")
@@ -75,10 +76,8 @@ def test_deploy_with_data_fix():
 
         # Verify JSON file has data
         json_path = os.path.join(temp_dir, "database_export.json")
-        with open(json_path, "r") as f:
-            data = json.load(f)
-            count = data.get("total_registrations", 0)
-            print(f"✅ JSON file contains {count} registrations")
+        count = read_registration_count(json_path)
+        print(f"✅ JSON file contains {count} registrations")
 
         return True
 
@@ -93,10 +92,9 @@ def test_export_files_exist():
         "database_import.sql",
     ]
 
-    missing_files = []
-    for file in export_files:
-        if not os.path.exists(file):
-            missing_files.append(file)
+    with os.scandir(".") as entries:
+        present = {entry.name for entry in entries}
+    missing_files = [file for file in export_files if file not in present]
 
     if missing_files:
         print(f"❌ Missing export files: {missing_files}")
@@ -106,10 +104,8 @@ def test_export_files_exist():
     print("✅ All export files exist locally")
 
     # Check JSON content
-    with open("database_export.json", "r") as f:
-        data = json.load(f)
-        count = data.get("total_registrations", 0)
-        print(f"✅ JSON file contains {count} registrations")
+    count = read_registration_count("database_export.json")
+    print(f"✅ JSON file contains {count} registrations")
 
     return True
 
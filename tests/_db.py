@@ -0,0 +1,39 @@
+"""
+In-memory SQLite helpers shared by the Nord Stern Car Numbers tests
+"""
+
+import os
+import sqlite3
+import sys
+import uuid
+
+
+def memory_db_uri(name):
+    """Shared-cache in-memory URI unique per call and per (xdist worker) process"""
+    return f"file:{name}_{os.getpid()}_{uuid.uuid4().hex}?mode=memory&cache=shared"
+
+
+def copy_to_memory(test, template_conn, name="test"):
+    """Give a test its own in-memory copy of a template database
+
+    The copy is page-copied with backup() rather than rebuilt, so no DDL or
+    fixture INSERTs are replayed and nothing touches the disk. The returned
+    connection keeps the database alive and is closed when the test ends.
+
+    Returns:
+        tuple: (uri, connection) for the new database
+    """
+    uri = memory_db_uri(name)
+    conn = sqlite3.connect(uri, uri=True)
+    test.addCleanup(conn.close)
+    template_conn.backup(conn)
+    return uri, conn
+
+
+def maybe_trace(conn):
+    """Echo every statement conn runs to stderr when TRACE_SQL is set
+
+    Without TRACE_SQL no callback is installed, so default runs pay nothing.
+    """
+    if os.environ.get("TRACE_SQL"):
+        conn.set_trace_callback(lambda sql: print(sql, file=sys.stderr))
@@ -0,0 +1,11 @@
+"""
+Shared pytest configuration for Nord Stern Car Numbers tests
+"""
+
+import sys
+from pathlib import Path
+
+# Make the app modules importable however pytest is launched, once per session
+PROJECT_ROOT = str(Path(__file__).resolve().parent.parent)
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
@@ -1,8 +1,8 @@
 import unittest
-import tempfile
-import os
+import re
 import sqlite3
 from datetime import datetime
+from unittest import mock
 from app import (
     app,
     init_db,
@@ -11,254 +11,295 @@ from app import (
     remove_usage_for_registration,
 )
 
+from tests._db import copy_to_memory, memory_db_uri
+
+
+class _FrozenDatetime(datetime):
+    """datetime with now() pinned to mid-2025 so year defaults are deterministic"""
+
+    @classmethod
+    def now(cls, tz=None):
+        return cls(2025, 6, 1, tzinfo=tz)
+
+
+# Test data with different car number formats and usage information
+_TEST_ROWS = (
+    # (first_name, last_name, car_number, sort_order, car_make, car_model, car_year, car_color, reserved_date, reserved_for_year, status, notes, last_usage_year, expiration_date, usage_count, is_active_in_period)
+    (
+        "John",
+        "Doe",
+        "4",
+        4,
+        "BMW",
+        "M3",
+        2020,
+        "Black",
+        "2022-01-15",
+        2025,
+        "Active",
+        "Test registration 1",
+        2025,
+        "2028-01-01",
+        1,
+        True,
+    ),
+    (
+        "Jane",
+        "Smith",
+        "04",
+        4,
+        "Porsche",
+        "911",
+        2021,
+        "Red",
+        "2023-01-16",
+        2025,
+        "Active",
+        "Test registration 2",
+        None,
+        "2026-01-01",
+        0,
+        True,
+    ),
+    (
+        "Bob",
+        "Johnson",
+        "004",
+        4,
+        "Audi",
+        "RS4",
+        2019,
+        "Silver",
+        "2020-01-10",
+        2025,
+        "Retired",
+        "Test registration 3",
+        2024,
+        "2027-01-01",
+        1,
+        True,
+    ),
+    (
+        "Alice",
+        "Brown",
+        "104",
+        104,
+        "BMW",
+        "M2",
+        2022,
+        "Blue",
+        "2021-01-17",
+        2025,
+        "Active",
+        "Test registration 4",
+        None,
+        "2024-01-01",
+        0,
+        False,
+    ),
+    (
+        "Charlie",
+        "Wilson",
+        "105",
+        105,
+        "Porsche",
+        "Cayman",
+        2020,
+        "White",
+        "2024-01-18",
+        2025,
+        "Active",
+        "Test registration 5",
+        2025,
+        "2028-01-01",
+        2,
+        True,
+    ),
+    (
+        "Sarah",
+        "Johnson",
+        "106",
+        106,
+        "Audi",
+        "TT RS",
+        2021,
+        "Gray",
+        "2022-01-19",
+        2025,
+        "Active",
+        "Test registration 6",
+        None,
+        "2025-01-01",
+        0,
+        True,
+    ),
+    (
+        "Michael",
+        "Chen",
+        "107",
+        107,
+        "BMW",
+        "M4",
+        2023,
+        "Green",
+        "2023-01-20",
+        2025,
+        "Active",
+        "Test registration 7",
+        2025,
+        "2028-01-01",
+        1,
+        True,
+    ),
+    (
+        "Lisa",
+        "Martinez",
+        "108",
+        108,
+        "Porsche",
+        "Boxster",
+        2018,
+        "Yellow",
+        "2020-01-21",
+        2025,
+        "Active",
+        "Test registration 8",
+        None,
+        "2023-01-01",
+        0,
+        False,
+    ),
+    (
+        "David",
+        "Thompson",
+        "109",
+        109,
+        "Audi",
+        "S4",
+        2020,
+        "White",
+        "2021-01-22",
+        2025,
+        "Active",
+        "Test registration 9",
+        2024,
+        "2027-01-01",
+        1,
+        True,
+    ),
+    (
+        "Emma",
+        "Davis",
+        "110",
+        110,
+        "BMW",
+        "M5",
+        2021,
+        "Blue",
+        "2022-01-23",
+        2025,
+        "Active",
+        "Test registration 10",
+        None,
+        "2025-01-01",
+        0,
+        True,
+    ),
+    (
+        "Leading",
+        "Zero",
+        "022",
+        22,
+        "Porsche",
+        "GT4",
+        2022,
+        "Red",
+        "2022-12-21",
+        2025,
+        "Active",
+        "Test with leading zero",
+        2025,
+        "2028-01-01",
+        1,
+        True,
+    ),
+)
+
+_INSERT_SQL = (
+    "INSERT INTO car_registrations "
+    "(first_name, last_name, car_number, sort_order, car_make, car_model, "
+    "car_year, car_color, reserved_date, reserved_for_year, status, notes, "
+    "last_usage_year, expiration_date, usage_count, is_active_in_period) "
+    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)"
+)
+
 
 class NordSternCarNumbersTestCase(unittest.TestCase):
     """Test cases for Nord Stern Car Numbers application"""
 
-    def setUp(self):
-        """Set up test database and client before each test"""
-        # Create a temporary database file
-        self.db_fd, self.db_path = tempfile.mkstemp()
+    @classmethod
+    def setUpClass(cls):
+        """Build the schema and test data once into a template database"""
+        template_path = memory_db_uri("template")
+        cls.template_conn = sqlite3.connect(template_path, uri=True)
+        # Class cleanups run even if the rest of setUpClass raises
+        cls.addClassCleanup(cls.template_conn.close)
+        init_db(template_path)
+        cls._insert_test_data(cls.template_conn)
+        # The schema never changes during a run, so snapshot its columns once
+        cls.columns = {
+            column[1]
+            for column in cls.template_conn.execute(
+                "PRAGMA table_info(car_registrations)"
+            )
+        }
 
-        # Configure app for testing
+        # Configure app for testing; only the database changes between tests
         app.config["TESTING"] = True
-        app.config["DATABASE"] = self.db_path
         app.config["SECRET_KEY"] = "test-secret-key"
+        # Never stat template files for changes, even if FLASK_DEBUG is set
+        app.config["TEMPLATES_AUTO_RELOAD"] = False
+        app.jinja_env.auto_reload = False
 
-        # Create test client
+    def setUp(self):
+        """Give each test a fresh copy of the template database"""
+        self.db_path, self.keepalive_conn = copy_to_memory(self, self.template_conn)
+        # Verification queries return rows addressable by column name
+        self.keepalive_conn.row_factory = sqlite3.Row
+
+        app.config["DATABASE"] = self.db_path
+        # A fresh client per test, so no session cookie or unconsumed flash
+        # message carries over from the previous test
         self.client = app.test_client()
 
-        # Initialize test database
-        with app.app_context():
-            init_db(self.db_path)
-            # Insert some test data
-            self._insert_test_data()
+    def _query_one(self, sql, params=()):
+        """Run a verification query on the test's open connection"""
+        return self.keepalive_conn.execute(sql, params).fetchone()
 
-    def tearDown(self):
-        """Clean up after each test"""
-        os.close(self.db_fd)
-        os.unlink(self.db_path)
+    def _assert_all_in(self, needles, haystack):
+        """Assert every needle occurs in haystack with a single regex scan
 
-    def _insert_test_data(self):
+        Needles must not overlap one another, since matches are non-overlapping.
+        """
+        pattern = re.compile(b"|".join(re.escape(needle) for needle in needles))
+        found = set(pattern.findall(haystack))
+        for needle in needles:
+            self.assertIn(needle, found)
+
+    def _pop_flashes(self):
+        """Consume the flashed messages left by a redirect that wasn't followed"""
+        with self.client.session_transaction() as session:
+            return [message for _, message in session.pop("_flashes", [])]
+
+    @staticmethod
+    def _insert_test_data(conn):
         """Insert test data into the database"""
-        conn = sqlite3.connect(self.db_path)
         cursor = conn.cursor()
 
-        # Test data with different car number formats and usage information
-        test_data = [
-            # (first_name, last_name, car_number, sort_order, car_make, car_model, car_year, car_color, reserved_date, reserved_for_year, status, notes, last_usage_year, expiration_date, usage_count, is_active_in_period)
-            (
-                "John",
-                "Doe",
-                "4",
-                4,
-                "BMW",
-                "M3",
-                2020,
-                "Black",
-                "2022-01-15",
-                2025,
-                "Active",
-                "Test registration 1",
-                2025,
-                "2028-01-01",
-                1,
-                True,
-            ),
-            (
-                "Jane",
-                "Smith",
-                "04",
-                4,
-                "Porsche",
-                "911",
-                2021,
-                "Red",
-                "2023-01-16",
-                2025,
-                "Active",
-                "Test registration 2",
-                None,
-                "2026-01-01",
-                0,
-                True,
-            ),
-            (
-                "Bob",
-                "Johnson",
-                "004",
-                4,
-                "Audi",
-                "RS4",
-                2019,
-                "Silver",
-                "2020-01-10",
-                2025,
-                "Retired",
-                "Test registration 3",
-                2024,
-                "2027-01-01",
-                1,
-                True,
-            ),
-            (
-                "Alice",
-                "Brown",
-                "104",
-                104,
-                "BMW",
-                "M2",
-                2022,
-                "Blue",
-                "2021-01-17",
-                2025,
-                "Active",
-                "Test registration 4",
-                None,
-                "2024-01-01",
-                0,
-                False,
-            ),
-            (
-                "Charlie",
-                "Wilson",
-                "105",
-                105,
-                "Porsche",
-                "Cayman",
-                2020,
-                "White",
-                "2024-01-18",
-                2025,
-                "Active",
-                "Test registration 5",
-                2025,
-                "2028-01-01",
-                2,
-                True,
-            ),
-            (
-                "Sarah",
-                "Johnson",
-                "106",
-                106,
-                "Audi",
-                "TT RS",
-                2021,
-                "Gray",
-                "2022-01-19",
-                2025,
-                "Active",
-                "Test registration 6",
-                None,
-                "2025-01-01",
-                0,
-                True,
-            ),
-            (
-                "Michael",
-                "Chen",
-                "107",
-                107,
-                "BMW",
-                "M4",
-                2023,
-                "Green",
-                "2023-01-20",
-                2025,
-                "Active",
-                "Test registration 7",
-                2025,
-                "2028-01-01",
-                1,
-                True,
-            ),
-            (
-                "Lisa",
-                "Martinez",
-                "108",
-                108,
-                "Porsche",
-                "Boxster",
-                2018,
-                "Yellow",
-                "2020-01-21",
-                2025,
-                "Active",
-                "Test registration 8",
-                None,
-                "2023-01-01",
-                0,
-                False,
-            ),
-            (
-                "David",
-                "Thompson",
-                "109",
-                109,
-                "Audi",
-                "S4",
-                2020,
-                "White",
-                "2021-01-22",
-                2025,
-                "Active",
-                "Test registration 9",
-                2024,
-                "2027-01-01",
-                1,
-                True,
-            ),
-            (
-                "Emma",
-                "Davis",
-                "110",
-                110,
-                "BMW",
-                "M5",
-                2021,
-                "Blue",
-                "2022-01-23",
-                2025,
-                "Active",
-                "Test registration 10",
-                None,
-                "2025-01-01",
-                0,
-                True,
-            ),
-            (
-                "Leading",
-                "Zero",
-                "022",
-                22,
-                "Porsche",
-                "GT4",
-                2022,
-                "Red",
-                "2022-12-21",
-                2025,
-                "Active",
-                "Test with leading zero",
-                2025,
-                "2028-01-01",
-                1,
-                True,
-            ),
-        ]
-
-        for data in test_data:
-            cursor.execute(
-                """
-                INSERT INTO car_registrations 
-                (first_name, last_name, car_number, sort_order, car_make, car_model, car_year, car_color, reserved_date, reserved_for_year, status, notes, last_usage_year, expiration_date, usage_count, is_active_in_period)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """,
-                data,
-            )
-
+        # Load every fixture row in one statement and one transaction
+        cursor.execute("BEGIN")
+        cursor.executemany(_INSERT_SQL, _TEST_ROWS)
         conn.commit()
-        conn.close()
 
     def test_home_page(self):
         """Test that home page loads successfully"""
@@ -292,9 +333,7 @@ class NordSternCarNumbersTestCase(unittest.TestCase):
         response = self.client.get("/search?q=&show_all=1")
         self.assertEqual(response.status_code, 200)
         # Should show all registrations
-        self.assertIn(b"John Doe", response.data)
-        self.assertIn(b"Jane Smith", response.data)
-        self.assertIn(b"Bob Johnson", response.data)
+        self._assert_all_in((b"John Doe", b"Jane Smith", b"Bob Johnson"), response.data)
 
     def test_search_by_status_active(self):
         """Test search by status - Active only"""
@@ -377,20 +416,16 @@ class NordSternCarNumbersTestCase(unittest.TestCase):
         self.assertIn(b"Registration added successfully", response.data)
 
         # Verify the registration was added with correct usage fields
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        cursor.execute(
+        result = self._query_one(
             "SELECT last_usage_year, usage_count, expiration_date, is_active_in_period FROM car_registrations WHERE car_number = ?",
             ("999",),
         )
-        result = cursor.fetchone()
-        conn.close()
 
         self.assertIsNotNone(result)
-        self.assertIsNone(result[0])  # last_usage_year should be None
-        self.assertEqual(result[1], 0)  # usage_count should be 0
-        self.assertIsNotNone(result[2])  # expiration_date should be set
-        self.assertTrue(result[3])  # is_active_in_period should be True
+        self.assertIsNone(result["last_usage_year"])
+        self.assertEqual(result["usage_count"], 0)
+        self.assertIsNotNone(result["expiration_date"])
+        self.assertTrue(result["is_active_in_period"])
 
     def test_add_registration_duplicate_number(self):
         """Test adding registration with duplicate car number"""
@@ -462,9 +497,14 @@ class NordSternCarNumbersTestCase(unittest.TestCase):
 
     def test_delete_registration(self):
         """Test registration deletion"""
-        response = self.client.post("/delete/1", follow_redirects=True)
-        self.assertEqual(response.status_code, 200)
-        self.assertIn(b"deleted successfully", response.data)
+        response = self.client.post("/delete/1")
+        self.assertEqual(response.status_code, 302)
+        self.assertTrue(
+            any("deleted successfully" in message for message in self._pop_flashes())
+        )
+        self.assertIsNone(
+            self._query_one("SELECT id FROM car_registrations WHERE id = ?", (1,))
+        )
 
     def test_api_check_number_available(self):
         """Test API check for available car number"""
@@ -511,16 +551,12 @@ class NordSternCarNumbersTestCase(unittest.TestCase):
         self.assertIn(b"Registration added successfully", response.data)
 
         # Verify the car number was formatted correctly
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        cursor.execute(
+        result = self._query_one(
             "SELECT car_number FROM car_registrations WHERE first_name = ? AND last_name = ?",
             ("Test", "User"),
         )
-        result = cursor.fetchone()
-        conn.close()
 
-        self.assertEqual(result[0], "001")
+        self.assertEqual(result["car_number"], "001")
 
     def test_search_with_leading_zeros(self):
         """Test search with leading zeros in car number"""
@@ -530,31 +566,15 @@ class NordSternCarNumbersTestCase(unittest.TestCase):
         # Should find the registration with car number '001'
 
     def test_flexible_car_number_search(self):
-        """Test the new flexible car number search functionality"""
-        # Test searching for "4" - should find all variations
-        response = self.client.get("/search?number=4")
-        self.assertEqual(response.status_code, 200)
-        self.assertIn(b"John Doe", response.data)  # "4"
-        self.assertIn(b"Jane Smith", response.data)  # "04"
-        self.assertIn(b"Bob Johnson", response.data)  # "004"
-
-    def test_flexible_car_number_search_with_leading_zero(self):
-        """Test searching with leading zero format"""
-        # Test searching for "04" - should find all variations
-        response = self.client.get("/search?number=04")
-        self.assertEqual(response.status_code, 200)
-        self.assertIn(b"John Doe", response.data)  # "4"
-        self.assertIn(b"Jane Smith", response.data)  # "04"
-        self.assertIn(b"Bob Johnson", response.data)  # "004"
-
-    def test_flexible_car_number_search_with_two_leading_zeros(self):
-        """Test searching with two leading zeros format"""
-        # Test searching for "004" - should find all variations
-        response = self.client.get("/search?number=004")
-        self.assertEqual(response.status_code, 200)
-        self.assertIn(b"John Doe", response.data)  # "4"
-        self.assertIn(b"Jane Smith", response.data)  # "04"
-        self.assertIn(b"Bob Johnson", response.data)  # "004"
+        """Test that "4", "04" and "004" each find every variation"""
+        for number in ("4", "04", "004"):
+            with self.subTest(number=number):
+                response = self.client.get(f"/search?number={number}")
+                self.assertEqual(response.status_code, 200)
+                # "4", "04" and "004" respectively
+                self._assert_all_in(
+                    (b"John Doe", b"Jane Smith", b"Bob Johnson"), response.data
+                )
 
     def test_flexible_car_number_search_invalid_number(self):
         """Test searching with invalid number format"""
@@ -629,51 +649,22 @@ class NordSternCarNumbersTestCase(unittest.TestCase):
         self.assertIn(b"Usage recorded successfully for 2025", response.data)
 
         # Verify usage was recorded correctly
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        cursor.execute(
+        result = self._query_one(
             "SELECT last_usage_year, usage_count FROM car_registrations WHERE id = ?",
             (2,),
         )
-        result = cursor.fetchone()
-        conn.close()
 
-        self.assertEqual(result[0], 2025)  # last_usage_year
-        self.assertEqual(result[1], 1)  # usage_count
+        self.assertEqual(result["last_usage_year"], 2025)
+        self.assertEqual(result["usage_count"], 1)
 
+    @mock.patch("app.datetime", _FrozenDatetime)
     def test_record_usage_api_default_year(self):
         """Test recording usage with default year (current year)"""
-        current_year = datetime.now().year
         response = self.client.post(
             "/api/record_usage/2", data={}, follow_redirects=True
         )
         self.assertEqual(response.status_code, 200)
-        self.assertIn(
-            f"Usage recorded successfully for {current_year}".encode(), response.data
-        )
-
-    def test_remove_usage_api(self):
-        """Test removing usage via API"""
-        # First record some usage
-        self.client.post("/api/record_usage/2", data={"usage_year": "2025"})
-
-        # Then remove it
-        response = self.client.post("/api/remove_usage/2", follow_redirects=True)
-        self.assertEqual(response.status_code, 200)
-        self.assertIn(b"Usage removed successfully", response.data)
-
-        # Verify usage was removed
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        cursor.execute(
-            "SELECT last_usage_year, usage_count FROM car_registrations WHERE id = ?",
-            (2,),
-        )
-        result = cursor.fetchone()
-        conn.close()
-
-        self.assertIsNone(result[0])  # last_usage_year should be None
-        self.assertEqual(result[1], 0)  # usage_count should be 0
+        self.assertIn(b"Usage recorded successfully for 2025", response.data)
 
     def test_record_usage_nonexistent_registration(self):
         """Test recording usage for non-existent registration"""
@@ -689,41 +680,19 @@ class NordSternCarNumbersTestCase(unittest.TestCase):
         self.assertEqual(response.status_code, 200)
         self.assertIn(b"Failed to remove usage", response.data)
 
-    def test_calculate_expiration_date_with_usage(self):
-        """Test expiration date calculation with usage"""
-        expiration_date, is_active = calculate_expiration_date("2022-01-15", 2025)
-        self.assertEqual(expiration_date, "2028-01-01")
-        self.assertTrue(is_active)
-
-    def test_calculate_expiration_date_without_usage(self):
-        """Test expiration date calculation without usage"""
-        expiration_date, is_active = calculate_expiration_date("2022-01-15", None)
-        self.assertEqual(expiration_date, "2025-01-01")
-        self.assertTrue(is_active)
-
-    def test_calculate_expiration_date_expired(self):
-        """Test expiration date calculation for expired registration"""
-        expiration_date, is_active = calculate_expiration_date("2020-01-15", None)
-        self.assertEqual(expiration_date, "2023-01-01")
-        self.assertFalse(is_active)  # Should be expired
-
     def test_update_usage_for_registration(self):
         """Test updating usage for registration"""
         success = update_usage_for_registration(2, 2025)
         self.assertTrue(success)
 
         # Verify the update
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        cursor.execute(
+        result = self._query_one(
             "SELECT last_usage_year, usage_count FROM car_registrations WHERE id = ?",
             (2,),
         )
-        result = cursor.fetchone()
-        conn.close()
 
-        self.assertEqual(result[0], 2025)
-        self.assertEqual(result[1], 1)
+        self.assertEqual(result["last_usage_year"], 2025)
+        self.assertEqual(result["usage_count"], 1)
 
     def test_remove_usage_for_registration(self):
         """Test removing usage for registration"""
@@ -735,35 +704,23 @@ class NordSternCarNumbersTestCase(unittest.TestCase):
         self.assertTrue(success)
 
         # Verify the removal
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        cursor.execute(
+        result = self._query_one(
             "SELECT last_usage_year, usage_count FROM car_registrations WHERE id = ?",
             (2,),
         )
-        result = cursor.fetchone()
-        conn.close()
 
-        self.assertIsNone(result[0])
-        self.assertEqual(result[1], 0)
+        self.assertIsNone(result["last_usage_year"])
+        self.assertEqual(result["usage_count"], 0)
 
     def test_database_structure(self):
         """Test that database has correct structure after cleanup"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-
         # Check that last_usage_date column doesn't exist
-        cursor.execute("PRAGMA table_info(car_registrations)")
-        columns = [col[1] for col in cursor.fetchall()]
-
-        self.assertNotIn("last_usage_date", columns)
-        self.assertIn("last_usage_year", columns)
-        self.assertIn("expiration_date", columns)
-        self.assertIn("usage_count", columns)
-        self.assertIn("is_active_in_period", columns)
-        self.assertIn("sort_order", columns)
-
-        conn.close()
+        self.assertNotIn("last_usage_date", self.columns)
+        self.assertIn("last_usage_year", self.columns)
+        self.assertIn("expiration_date", self.columns)
+        self.assertIn("usage_count", self.columns)
+        self.assertIn("is_active_in_period", self.columns)
+        self.assertIn("sort_order", self.columns)
 
     def test_search_results_usage_display(self):
         """Test that search results show usage information correctly"""
@@ -771,9 +728,7 @@ class NordSternCarNumbersTestCase(unittest.TestCase):
         self.assertEqual(response.status_code, 200)
 
         # Should show usage information for registrations with usage
-        self.assertIn(b"Last: 2025", response.data)
-        self.assertIn(b"Count: 1", response.data)
-        self.assertIn(b"No usage", response.data)
+        self._assert_all_in((b"Last: 2025", b"Count: 1", b"No usage"), response.data)
 
     def test_search_results_expiration_display(self):
         """Test that search results show expiration dates correctly"""
@@ -834,11 +789,8 @@ class NordSternCarNumbersTestCase(unittest.TestCase):
     def test_export_api_endpoint_empty_database(self):
         """Test the /api/export endpoint with empty database"""
         # Clear the database
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        cursor.execute("DELETE FROM car_registrations")
-        conn.commit()
-        conn.close()
+        self.keepalive_conn.execute("DELETE FROM car_registrations")
+        self.keepalive_conn.commit()
 
         response = self.client.get("/api/export")
         self.assertEqual(response.status_code, 200)
@@ -907,5 +859,27 @@ class NordSternCarNumbersTestCase(unittest.TestCase):
             self.fail("export_date is not in valid ISO format")
 
 
+class CalculateExpirationDateTests(unittest.TestCase):
+    """Pure-function tests that need no database or test client"""
+
+    def test_calculate_expiration_date_with_usage(self):
+        """Test expiration date calculation with usage"""
+        expiration_date, is_active = calculate_expiration_date("2022-01-15", 2025)
+        self.assertEqual(expiration_date, "2028-01-01")
+        self.assertTrue(is_active)
+
+    def test_calculate_expiration_date_without_usage(self):
+        """Test expiration date calculation without usage"""
+        expiration_date, is_active = calculate_expiration_date("2022-01-15", None)
+        self.assertEqual(expiration_date, "2025-01-01")
+        self.assertTrue(is_active)
+
+    def test_calculate_expiration_date_expired(self):
+        """Test expiration date calculation for expired registration"""
+        expiration_date, is_active = calculate_expiration_date("2020-01-15", None)
+        self.assertEqual(expiration_date, "2023-01-01")
+        self.assertFalse(is_active)  # Should be expired
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -3,44 +3,74 @@ Tests for data preservation mechanism in Nord Stern Car Numbers
 """
 
 import unittest
-import tempfile
-import os
 import json
 import sqlite3
 from datetime import datetime
 from app import app, init_db
 
+from tests._db import copy_to_memory, memory_db_uri
+
+
+# Fields every export must carry, checked with one set difference per object
+REQUIRED_TOP_LEVEL_FIELDS = frozenset(
+    {"export_date", "total_registrations", "registrations"}
+)
+REQUIRED_REGISTRATION_FIELDS = frozenset(
+    {
+        "id",
+        "first_name",
+        "last_name",
+        "car_number",
+        "sort_order",
+        "car_make",
+        "car_model",
+        "car_year",
+        "car_color",
+        "reserved_date",
+        "reserved_for_year",
+        "status",
+        "notes",
+        "last_usage_year",
+        "expiration_date",
+        "usage_count",
+        "is_active_in_period",
+        "created_at",
+        "updated_at",
+    }
+)
+
 
 class DataPreservationTestCase(unittest.TestCase):
     """Test cases for data preservation mechanism"""
 
-    def setUp(self):
-        """Set up test database and client before each test"""
-        # Create a temporary database file
-        self.db_fd, self.db_path = tempfile.mkstemp()
+    @classmethod
+    def setUpClass(cls):
+        """Build the schema and test data once into a template database"""
+        template_path = memory_db_uri("template")
+        cls.template_conn = sqlite3.connect(template_path, uri=True)
+        cls.addClassCleanup(cls.template_conn.close)
+        init_db(template_path)
+        cls._insert_test_data(cls.template_conn)
 
-        # Configure app for testing
+        # Configure app for testing; only the database changes between tests
         app.config["TESTING"] = True
-        app.config["DATABASE"] = self.db_path
         app.config["SECRET_KEY"] = "test-secret-key"
+        cls.client = app.test_client()
 
-        # Create test client
-        self.client = app.test_client()
+        # Most tests only read the export of the unmodified fixture, so fetch it once
+        app.config["DATABASE"] = template_path
+        cls.export_response = cls.client.get("/api/export")
+        cls.export_data = cls.export_response.get_json()
 
-        # Initialize test database
-        with app.app_context():
-            init_db(self.db_path)
-            # Insert test data
-            self._insert_test_data()
+    def setUp(self):
+        """Give each test a fresh copy of the template database"""
+        self.db_path, self.keepalive_conn = copy_to_memory(self, self.template_conn)
 
-    def tearDown(self):
-        """Clean up after each test"""
-        os.close(self.db_fd)
-        os.unlink(self.db_path)
+        app.config["DATABASE"] = self.db_path
 
-    def _insert_test_data(self):
+    @staticmethod
+    def _insert_test_data(conn):
         """Insert test data into the database"""
-        conn = sqlite3.connect(self.db_path)
         cursor = conn.cursor()
 
         # Test data for data preservation testing
@@ -101,33 +131,32 @@ class DataPreservationTestCase(unittest.TestCase):
             ),
         ]
 
-        for data in test_data:
-            cursor.execute(
-                """
-                INSERT INTO car_registrations 
-                (first_name, last_name, car_number, sort_order, car_make, car_model, 
-                 car_year, car_color, reserved_date, reserved_for_year, status, notes, 
-                 last_usage_year, expiration_date, usage_count, is_active_in_period, 
-                 created_at, updated_at)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """,
-                data + (datetime.now().isoformat(), datetime.now().isoformat()),
-            )
-
+        # One timestamp for every row, loaded in one statement and one transaction
+        now = datetime.now().isoformat()
+        cursor.execute("BEGIN")
+        cursor.executemany(
+            """
+            INSERT INTO car_registrations 
+            (first_name, last_name, car_number, sort_order, car_make, car_model, 
+             car_year, car_color, reserved_date, reserved_for_year, status, notes, 
+             last_usage_year, expiration_date, usage_count, is_active_in_period, 
+             created_at, updated_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """,
+            [data + (now, now) for data in test_data],
+        )
         conn.commit()
-        conn.close()
 
     def test_export_api_complete_data_structure(self):
         """Test that export API returns complete data structure"""
-        response = self.client.get("/api/export")
+        response = self.export_response
         self.assertEqual(response.status_code, 200)
 
-        data = response.get_json()
+        data = self.export_data
 
         # Check top-level structure
-        required_top_level = ["export_date", "total_registrations", "registrations"]
-        for field in required_top_level:
-            self.assertIn(field, data)
+        missing = REQUIRED_TOP_LEVEL_FIELDS - data.keys()
+        self.assertFalse(missing, f"Export missing fields: {missing}")
 
         # Check data types
         self.assertIsInstance(data["export_date"], str)
@@ -140,64 +169,43 @@ class DataPreservationTestCase(unittest.TestCase):
 
     def test_export_api_registration_fields(self):
         """Test that each registration has all required fields"""
-        response = self.client.get("/api/export")
-        data = response.get_json()
-
-        required_fields = [
-            "id",
-            "first_name",
-            "last_name",
-            "car_number",
-            "sort_order",
-            "car_make",
-            "car_model",
-            "car_year",
-            "car_color",
-            "reserved_date",
-            "reserved_for_year",
-            "status",
-            "notes",
-            "last_usage_year",
-            "expiration_date",
-            "usage_count",
-            "is_active_in_period",
-            "created_at",
-            "updated_at",
-        ]
+        data = self.export_data
 
         for registration in data["registrations"]:
-            for field in required_fields:
-                self.assertIn(
-                    field, registration, f"Registration missing field: {field}"
-                )
+            missing = REQUIRED_REGISTRATION_FIELDS - registration.keys()
+            self.assertFalse(missing, f"Registration missing fields: {missing}")
 
     def test_export_api_data_accuracy(self):
         """Test that exported data matches database content"""
-        response = self.client.get("/api/export")
-        data = response.get_json()
-
-        # Get data directly from database for comparison
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        cursor.execute("SELECT * FROM car_registrations ORDER BY id")
-        db_rows = cursor.fetchall()
-        conn.close()
-
-        # Check that we have the same number of records
-        self.assertEqual(len(data["registrations"]), len(db_rows))
-
-        # Check that the data matches
-        for i, registration in enumerate(data["registrations"]):
-            db_row = db_rows[i]
-            self.assertEqual(registration["first_name"], db_row[1])
-            self.assertEqual(registration["last_name"], db_row[2])
-            self.assertEqual(registration["car_number"], db_row[3])
-            self.assertEqual(registration["sort_order"], db_row[4])
+        data = self.export_data
+
+        # Get just the compared columns directly from the database
+        cursor = self.keepalive_conn.execute(
+            "SELECT first_name, last_name, car_number, sort_order "
+            "FROM car_registrations ORDER BY id"
+        )
+
+        # Stream the rows; strict=True fails the test if the record counts differ
+        for registration, (first_name, last_name, car_number, sort_order) in zip(
+            data["registrations"], cursor, strict=True
+        ):
+            self.assertEqual(registration["first_name"], first_name)
+            self.assertEqual(registration["last_name"], last_name)
+            self.assertEqual(registration["car_number"], car_number)
+            self.assertEqual(registration["sort_order"], sort_order)
+        cursor.close()
+
+    def test_export_api_matches_python_row_dicts(self):
+        """Test that the SQLite-built export equals rows converted in Python"""
+        cursor = self.keepalive_conn.execute("SELECT * FROM car_registrations")
+        columns = [description[0] for description in cursor.description]
+        expected = [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+        self.assertEqual(self.export_data["registrations"], expected)
 
     def test_export_api_timestamp_format(self):
         """Test that export_date is in valid ISO format"""
-        response = self.client.get("/api/export")
-        data = response.get_json()
+        data = self.export_data
 
         export_date = data["export_date"]
 
@@ -213,11 +221,8 @@ class DataPreservationTestCase(unittest.TestCase):
     def test_export_api_empty_database(self):
         """Test export API with empty database"""
         # Clear the database
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        cursor.execute("DELETE FROM car_registrations")
-        conn.commit()
-        conn.close()
+        self.keepalive_conn.execute("DELETE FROM car_registrations")
+        self.keepalive_conn.commit()
 
         response = self.client.get("/api/export")
         self.assertEqual(response.status_code, 200)
@@ -229,10 +234,10 @@ class DataPreservationTestCase(unittest.TestCase):
 
     def test_export_api_json_serialization(self):
         """Test that exported data can be serialized to JSON"""
-        response = self.client.get("/api/export")
+        response = self.export_response
         self.assertEqual(response.status_code, 200)
 
-        data = response.get_json()
+        data = self.export_data
 
         # Try to serialize the data back to JSON
         try:
@@ -245,14 +250,14 @@ class DataPreservationTestCase(unittest.TestCase):
 
     def test_export_api_content_type(self):
         """Test that export API returns correct content type"""
-        response = self.client.get("/api/export")
+        response = self.export_response
         self.assertEqual(response.status_code, 200)
         self.assertEqual(response.content_type, "application/json")
 
     def test_export_api_error_handling(self):
         """Test that export API handles database errors gracefully"""
         # Close the database connection to simulate an error
-        conn = sqlite3.connect(self.db_path)
+        conn = sqlite3.connect(self.db_path, uri=True)
         conn.close()
 
         # Try to export data
@@ -1,32 +1,105 @@
 import unittest
-import tempfile
-import os
+import re
 import sqlite3
 from datetime import datetime
 from app import (
+    app,
     init_db,
     calculate_expiration_date,
     update_usage_for_registration,
     remove_usage_for_registration,
 )
 
+from tests._db import copy_to_memory, memory_db_uri
+
+
+# SQLite CURRENT_TIMESTAMP text, e.g. "2025-01-15 12:34:56"
+_TIMESTAMP_RE = re.compile(r"^\d{4}-\d{2}-\d{2}[ T]\d{2}:\d{2}:\d{2}")
+
+_INSERT_SQL = (
+    "INSERT INTO car_registrations "
+    "(first_name, last_name, car_number, sort_order, car_make, car_model, "
+    "car_year, car_color, reserved_date, notes) "
+    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)"
+)
+
+# The standard single registration most tests start from
+_JOHN_DOE = (
+    "John",
+    "Doe",
+    "101",
+    101,
+    "BMW",
+    "M3",
+    2020,
+    "Black",
+    "2022-01-15",
+    "Test",
+)
+
+# Two registrations for the same car number, which the schema allows
+_DUPLICATE_ROWS = (
+    (
+        "John",
+        "Doe",
+        "101",
+        101,
+        "BMW",
+        "M3",
+        2020,
+        "Black",
+        "2022-01-15",
+        "Test 1",
+    ),
+    (
+        "Jane",
+        "Smith",
+        "101",
+        101,
+        "Porsche",
+        "911",
+        2021,
+        "Red",
+        "2022-01-16",
+        "Test 2",
+    ),
+)
+
 
 class DatabaseTestCase(unittest.TestCase):
     """Test cases for database operations"""
 
+    @classmethod
+    def setUpClass(cls):
+        """Build the schema once into a template database"""
+        template_path = memory_db_uri("template")
+        cls.template_conn = sqlite3.connect(template_path, uri=True)
+        cls.addClassCleanup(cls.template_conn.close)
+        init_db(template_path)
+
     def setUp(self):
         """Set up test database before each test"""
-        self.db_fd, self.db_path = tempfile.mkstemp()
-        init_db(self.db_path)
-
-    def tearDown(self):
-        """Clean up after each test"""
-        os.close(self.db_fd)
-        os.unlink(self.db_path)
+        self.db_path, self.keepalive_conn = copy_to_memory(self, self.template_conn)
+        # Point the usage helpers at this test's database
+        app.config["DATABASE"] = self.db_path
+
+    @staticmethod
+    def _insert_john_doe(conn, returning=None):
+        """Insert and commit the standard single test registration (car 101)
+
+        If returning names columns, the stored values come back via RETURNING.
+        """
+        sql = _INSERT_SQL
+        if returning is not None:
+            sql += f" RETURNING {returning}"
+        # fetchall() runs the statement to completion so the commit can proceed
+        rows = conn.execute(sql, _JOHN_DOE).fetchall()
+        conn.commit()
+        return rows[0] if rows else None
 
     def test_database_creation(self):
         """Test that database is created with correct structure"""
-        conn = sqlite3.connect(self.db_path)
+        conn = self.keepalive_conn
         cursor = conn.cursor()
 
         # Check that table exists
@@ -41,32 +114,34 @@ class DatabaseTestCase(unittest.TestCase):
         columns = cursor.fetchall()
 
         # Verify all required columns exist
-        column_names = [col[1] for col in columns]
-
-        required_columns = [
-            "id",
-            "first_name",
-            "last_name",
-            "car_number",
-            "sort_order",
-            "car_make",
-            "car_model",
-            "car_year",
-            "car_color",
-            "reserved_date",
-            "reserved_for_year",
-            "status",
-            "notes",
-            "last_usage_year",
-            "expiration_date",
-            "usage_count",
-            "is_active_in_period",
-            "created_at",
-            "updated_at",
-        ]
-
-        for col in required_columns:
-            self.assertIn(col, column_names, f"Column {col} not found in database")
+        column_names = {col[1] for col in columns}
+
+        required_columns = frozenset(
+            {
+                "id",
+                "first_name",
+                "last_name",
+                "car_number",
+                "sort_order",
+                "car_make",
+                "car_model",
+                "car_year",
+                "car_color",
+                "reserved_date",
+                "reserved_for_year",
+                "status",
+                "notes",
+                "last_usage_year",
+                "expiration_date",
+                "usage_count",
+                "is_active_in_period",
+                "created_at",
+                "updated_at",
+            }
+        )
+
+        missing = required_columns - column_names
+        self.assertFalse(missing, f"Columns {missing} not found in database")
 
         # Verify that old column doesn't exist
         self.assertNotIn(
@@ -75,20 +150,14 @@ class DatabaseTestCase(unittest.TestCase):
             "Old last_usage_date column should not exist",
         )
 
-        conn.close()
-
     def test_insert_registration(self):
         """Test inserting a new registration"""
-        conn = sqlite3.connect(self.db_path)
+        conn = self.keepalive_conn
         cursor = conn.cursor()
 
         # Insert test registration
         cursor.execute(
-            """
-            INSERT INTO car_registrations 
-            (first_name, last_name, car_number, sort_order, car_make, car_model, car_year, car_color, reserved_date, notes)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        """,
+            f"{_INSERT_SQL} RETURNING *",
             (
                 "John",
                 "Doe",
@@ -102,13 +171,10 @@ class DatabaseTestCase(unittest.TestCase):
                 "Test registration",
             ),
         )
-
+        # Verify insertion from the RETURNING row instead of a follow-up SELECT
+        result = cursor.fetchall()[0]
         conn.commit()
 
-        # Verify insertion
-        cursor.execute("SELECT * FROM car_registrations WHERE car_number = ?", ("101",))
-        result = cursor.fetchone()
-
         self.assertIsNotNone(result)
         self.assertEqual(result[1], "John")  # first_name
         self.assertEqual(result[2], "Doe")  # last_name
@@ -119,20 +185,14 @@ class DatabaseTestCase(unittest.TestCase):
         self.assertEqual(result[15], 0)  # usage_count should be 0
         # Note: expiration_date and is_active_in_period are not automatically calculated during direct DB insertion
 
-        conn.close()
-
     def test_car_number_formatting(self):
         """Test car number formatting with leading zeros"""
-        conn = sqlite3.connect(self.db_path)
+        conn = self.keepalive_conn
         cursor = conn.cursor()
 
         # Insert registration with single digit (application would format this, but we're testing raw DB)
         cursor.execute(
-            """
-            INSERT INTO car_registrations 
-            (first_name, last_name, car_number, sort_order, car_make, car_model, car_year, car_color, reserved_date, notes)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        """,
+            _INSERT_SQL,
             ("Test", "User", "1", 1, "BMW", "M3", 2020, "Black", "2022-01-15", "Test"),
         )
 
@@ -146,115 +206,36 @@ class DatabaseTestCase(unittest.TestCase):
 
         self.assertEqual(result[0], "1")  # Raw value as stored
 
-        conn.close()
-
     def test_timestamp_creation(self):
         """Test that timestamps are created automatically"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-
-        # Insert registration
-        cursor.execute(
-            """
-            INSERT INTO car_registrations 
-            (first_name, last_name, car_number, sort_order, car_make, car_model, car_year, car_color, reserved_date, notes)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        """,
-            (
-                "John",
-                "Doe",
-                "101",
-                101,
-                "BMW",
-                "M3",
-                2020,
-                "Black",
-                "2022-01-15",
-                "Test",
-            ),
-        )
+        conn = self.keepalive_conn
 
-        conn.commit()
-
-        # Check timestamps
-        cursor.execute(
-            "SELECT created_at, updated_at FROM car_registrations WHERE car_number = ?",
-            ("101",),
-        )
-        result = cursor.fetchone()
+        # Insert registration, reading the generated timestamps back directly
+        result = self._insert_john_doe(conn, returning="created_at, updated_at")
 
         self.assertIsNotNone(result[0])  # created_at
         self.assertIsNotNone(result[1])  # updated_at
 
         # Verify timestamps are in valid format (contain date and time)
-        self.assertIn(":", result[0])  # Should contain time
-        self.assertIn(":", result[1])  # Should contain time
-        self.assertIn("-", result[0])  # Should contain date
-        self.assertIn("-", result[1])  # Should contain date
+        self.assertRegex(result[0], _TIMESTAMP_RE)
+        self.assertRegex(result[1], _TIMESTAMP_RE)
 
         # Verify timestamps are recent (within last 5 hours to be very lenient for test environment)
-        try:
-            created_at = datetime.strptime(result[0], "%Y-%m-%d %H:%M:%S")
-            updated_at = datetime.strptime(result[1], "%Y-%m-%d %H:%M:%S")
-            now = datetime.now()
-
-            self.assertLess(abs((now - created_at).total_seconds()), 18000)  # 5 hours
-            self.assertLess(abs((now - updated_at).total_seconds()), 18000)  # 5 hours
-        except ValueError:
-            # If timestamp format is different, just verify they exist and have valid format
-            self.assertTrue(len(result[0]) > 10)  # Should be a reasonable length
-            self.assertTrue(len(result[1]) > 10)  # Should be a reasonable length
+        # CURRENT_TIMESTAMP is always "YYYY-MM-DD HH:MM:SS", which fromisoformat reads
+        created_at = datetime.fromisoformat(result[0])
+        updated_at = datetime.fromisoformat(result[1])
+        now = datetime.now()
 
-        conn.close()
+        self.assertLess(abs((now - created_at).total_seconds()), 18000)  # 5 hours
+        self.assertLess(abs((now - updated_at).total_seconds()), 18000)  # 5 hours
 
     def test_duplicate_car_numbers_allowed(self):
         """Test that duplicate car numbers are now allowed"""
-        conn = sqlite3.connect(self.db_path)
+        conn = self.keepalive_conn
         cursor = conn.cursor()
 
-        # Insert first registration
-        cursor.execute(
-            """
-            INSERT INTO car_registrations 
-            (first_name, last_name, car_number, sort_order, car_make, car_model, car_year, car_color, reserved_date, notes)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        """,
-            (
-                "John",
-                "Doe",
-                "101",
-                101,
-                "BMW",
-                "M3",
-                2020,
-                "Black",
-                "2022-01-15",
-                "Test 1",
-            ),
-        )
-
-        conn.commit()
-
-        # Insert duplicate car number (should now be allowed)
-        cursor.execute(
-            """
-            INSERT INTO car_registrations 
-            (first_name, last_name, car_number, sort_order, car_make, car_model, car_year, car_color, reserved_date, notes)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        """,
-            (
-                "Jane",
-                "Smith",
-                "101",
-                101,
-                "Porsche",
-                "911",
-                2021,
-                "Red",
-                "2022-01-16",
-                "Test 2",
-            ),
-        )
+        # Insert two registrations sharing a car number in one batch
+        cursor.executemany(_INSERT_SQL, _DUPLICATE_ROWS)
         conn.commit()
 
         # Verify both registrations exist
@@ -264,77 +245,24 @@ class DatabaseTestCase(unittest.TestCase):
         count = cursor.fetchone()[0]
         self.assertEqual(count, 2)
 
-        conn.close()
-
-    def test_calculate_expiration_date_function(self):
-        """Test the calculate_expiration_date function"""
-        # Test with usage
-        expiration_date, is_active = calculate_expiration_date("2022-01-15", 2025)
-        self.assertEqual(expiration_date, "2028-01-01")
-        self.assertTrue(is_active)
-
-        # Test without usage
-        expiration_date, is_active = calculate_expiration_date("2022-01-15", None)
-        self.assertEqual(expiration_date, "2025-01-01")
-        self.assertTrue(is_active)
-
-        # Test expired registration
-        expiration_date, is_active = calculate_expiration_date("2020-01-15", None)
-        self.assertEqual(expiration_date, "2023-01-01")
-        self.assertFalse(is_active)
-
-        # Test with invalid date
-        expiration_date, is_active = calculate_expiration_date("invalid-date", None)
-        self.assertIsNone(expiration_date)
-        self.assertFalse(is_active)
-
     def test_update_usage_for_registration(self):
         """Test updating usage for a registration"""
-        # Set up the database path for the function
-        import app
-
-        app.app.config["DATABASE"] = self.db_path
-
-        conn = sqlite3.connect(self.db_path)
+        conn = self.keepalive_conn
         cursor = conn.cursor()
 
         # Insert test registration
-        cursor.execute(
-            """
-            INSERT INTO car_registrations 
-            (first_name, last_name, car_number, sort_order, car_make, car_model, car_year, car_color, reserved_date, notes)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        """,
-            (
-                "John",
-                "Doe",
-                "101",
-                101,
-                "BMW",
-                "M3",
-                2020,
-                "Black",
-                "2022-01-15",
-                "Test",
-            ),
-        )
-
-        conn.commit()
-        conn.close()
+        self._insert_john_doe(conn)
 
         # Update usage
         success = update_usage_for_registration(1, 2025)
         self.assertTrue(success)
 
         # Verify the update
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
         cursor.execute(
             "SELECT last_usage_year, usage_count, expiration_date, is_active_in_period FROM car_registrations WHERE id = ?",
             (1,),
         )
         result = cursor.fetchone()
-        conn.close()
 
         self.assertEqual(result[0], 2025)  # last_usage_year
         self.assertEqual(result[1], 1)  # usage_count
@@ -343,51 +271,22 @@ class DatabaseTestCase(unittest.TestCase):
 
     def test_update_usage_for_registration_multiple_times(self):
         """Test updating usage multiple times"""
-        # Set up the database path for the function
-        import app
-
-        app.app.config["DATABASE"] = self.db_path
-
-        conn = sqlite3.connect(self.db_path)
+        conn = self.keepalive_conn
         cursor = conn.cursor()
 
         # Insert test registration
-        cursor.execute(
-            """
-            INSERT INTO car_registrations 
-            (first_name, last_name, car_number, sort_order, car_make, car_model, car_year, car_color, reserved_date, notes)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        """,
-            (
-                "John",
-                "Doe",
-                "101",
-                101,
-                "BMW",
-                "M3",
-                2020,
-                "Black",
-                "2022-01-15",
-                "Test",
-            ),
-        )
-
-        conn.commit()
-        conn.close()
+        self._insert_john_doe(conn)
 
         # Update usage multiple times
         update_usage_for_registration(1, 2024)
         update_usage_for_registration(1, 2025)
 
         # Verify the final state
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
         cursor.execute(
             "SELECT last_usage_year, usage_count, expiration_date FROM car_registrations WHERE id = ?",
             (1,),
         )
         result = cursor.fetchone()
-        conn.close()
 
         self.assertEqual(result[0], 2025)  # last_usage_year (should be the latest)
         self.assertEqual(result[1], 2)  # usage_count (should be incremented)
@@ -397,12 +296,7 @@ class DatabaseTestCase(unittest.TestCase):
 
     def test_remove_usage_for_registration(self):
         """Test removing usage for a registration"""
-        # Set up the database path for the function
-        import app
-
-        app.app.config["DATABASE"] = self.db_path
-
-        conn = sqlite3.connect(self.db_path)
+        conn = self.keepalive_conn
         cursor = conn.cursor()
 
         # Insert test registration with usage
@@ -429,21 +323,17 @@ class DatabaseTestCase(unittest.TestCase):
         )
 
         conn.commit()
-        conn.close()
 
         # Remove usage
         success = remove_usage_for_registration(1)
         self.assertTrue(success)
 
         # Verify the removal
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
         cursor.execute(
             "SELECT last_usage_year, usage_count, expiration_date, is_active_in_period FROM car_registrations WHERE id = ?",
             (1,),
         )
         result = cursor.fetchone()
-        conn.close()
 
         self.assertIsNone(result[0])  # last_usage_year should be None
         self.assertEqual(result[1], 0)  # usage_count should be 0
@@ -454,72 +344,21 @@ class DatabaseTestCase(unittest.TestCase):
 
     def test_update_usage_nonexistent_registration(self):
         """Test updating usage for non-existent registration"""
-        # Set up the database path for the function
-        import app
-
-        app.app.config["DATABASE"] = self.db_path
-
         success = update_usage_for_registration(999, 2025)
         self.assertFalse(success)
 
     def test_remove_usage_nonexistent_registration(self):
         """Test removing usage for non-existent registration"""
-        # Set up the database path for the function
-        import app
-
-        app.app.config["DATABASE"] = self.db_path
-
         success = remove_usage_for_registration(999)
         self.assertFalse(success)
 
     def test_database_duplicate_insertion(self):
         """Test that duplicate car numbers can be inserted successfully"""
-        conn = sqlite3.connect(self.db_path)
+        conn = self.keepalive_conn
         cursor = conn.cursor()
 
-        # Insert valid registration
-        cursor.execute(
-            """
-            INSERT INTO car_registrations 
-            (first_name, last_name, car_number, sort_order, car_make, car_model, car_year, car_color, reserved_date, notes)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        """,
-            (
-                "John",
-                "Doe",
-                "101",
-                101,
-                "BMW",
-                "M3",
-                2020,
-                "Black",
-                "2022-01-15",
-                "Test",
-            ),
-        )
-
-        conn.commit()
-
-        # Insert duplicate (should now succeed)
-        cursor.execute(
-            """
-            INSERT INTO car_registrations 
-            (first_name, last_name, car_number, sort_order, car_make, car_model, car_year, car_color, reserved_date, notes)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        """,
-            (
-                "Jane",
-                "Smith",
-                "101",
-                101,
-                "Porsche",
-                "911",
-                2021,
-                "Red",
-                "2022-01-16",
-                "Test 2",
-            ),
-        )
+        # Insert two registrations sharing a car number in one batch
+        cursor.executemany(_INSERT_SQL, _DUPLICATE_ROWS)
         conn.commit()
 
         # Verify both registrations exist
@@ -527,115 +366,29 @@ class DatabaseTestCase(unittest.TestCase):
         count = cursor.fetchone()[0]
         self.assertEqual(count, 2)
 
-        conn.close()
-
     def test_reserved_date_validation(self):
         """Test reserved date validation and formatting"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-
-        # Test with valid date
-        cursor.execute(
-            """
-            INSERT INTO car_registrations 
-            (first_name, last_name, car_number, sort_order, car_make, car_model, car_year, car_color, reserved_date, notes)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        """,
-            (
-                "John",
-                "Doe",
-                "101",
-                101,
-                "BMW",
-                "M3",
-                2020,
-                "Black",
-                "2022-01-15",
-                "Test",
-            ),
-        )
-
-        conn.commit()
+        conn = self.keepalive_conn
 
-        # Verify date was stored correctly
-        cursor.execute(
-            "SELECT reserved_date FROM car_registrations WHERE car_number = ?", ("101",)
-        )
-        result = cursor.fetchone()
+        # Test with valid date and verify it was stored correctly
+        result = self._insert_john_doe(conn, returning="reserved_date")
         self.assertEqual(result[0], "2022-01-15")
 
-        conn.close()
-
     def test_status_field_defaults(self):
         """Test status field defaults and values"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        conn = self.keepalive_conn
 
-        # Insert registration without specifying status
-        cursor.execute(
-            """
-            INSERT INTO car_registrations 
-            (first_name, last_name, car_number, sort_order, car_make, car_model, car_year, car_color, reserved_date, notes)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        """,
-            (
-                "John",
-                "Doe",
-                "101",
-                101,
-                "BMW",
-                "M3",
-                2020,
-                "Black",
-                "2022-01-15",
-                "Test",
-            ),
-        )
-
-        conn.commit()
-
-        # Verify default status
-        cursor.execute(
-            "SELECT status FROM car_registrations WHERE car_number = ?", ("101",)
-        )
-        result = cursor.fetchone()
+        # Insert registration without specifying status and verify the default
+        result = self._insert_john_doe(conn, returning="status")
         self.assertEqual(result[0], "Active")
 
-        conn.close()
-
     def test_usage_count_increment(self):
         """Test that usage count increments correctly"""
-        # Set up the database path for the function
-        import app
-
-        app.app.config["DATABASE"] = self.db_path
-
-        conn = sqlite3.connect(self.db_path)
+        conn = self.keepalive_conn
         cursor = conn.cursor()
 
         # Insert test registration
-        cursor.execute(
-            """
-            INSERT INTO car_registrations 
-            (first_name, last_name, car_number, sort_order, car_make, car_model, car_year, car_color, reserved_date, notes)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        """,
-            (
-                "John",
-                "Doe",
-                "101",
-                101,
-                "BMW",
-                "M3",
-                2020,
-                "Black",
-                "2022-01-15",
-                "Test",
-            ),
-        )
-
-        conn.commit()
-        conn.close()
+        self._insert_john_doe(conn)
 
         # Update usage multiple times
         update_usage_for_registration(1, 2024)
@@ -643,38 +396,50 @@ class DatabaseTestCase(unittest.TestCase):
         update_usage_for_registration(1, 2026)
 
         # Verify usage count
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
         cursor.execute("SELECT usage_count FROM car_registrations WHERE id = ?", (1,))
         result = cursor.fetchone()
-        conn.close()
 
         self.assertEqual(result[0], 3)  # Should be 3 after 3 updates
 
-    def test_expiration_date_calculation_edge_cases(self):
-        """Test expiration date calculation edge cases"""
-        # Test with very old reservation
-        expiration_date, is_active = calculate_expiration_date("1959-03-28", None)
-        self.assertEqual(expiration_date, "1962-01-01")
-        self.assertFalse(is_active)
-
-        # Test with future reservation
-        future_year = datetime.now().year + 5
-        expiration_date, is_active = calculate_expiration_date(
-            f"{future_year}-01-01", None
+
+class CalculateExpirationTestCase(unittest.TestCase):
+    """Pure-function tests for calculate_expiration_date; no database needed"""
+
+    def _assert_cases(self, cases):
+        """Check (reserved_date, last_usage_year, expiration, is_active) rows"""
+        for reserved_date, last_usage_year, expected, expected_active in cases:
+            with self.subTest(reserved_date=reserved_date, usage=last_usage_year):
+                expiration_date, is_active = calculate_expiration_date(
+                    reserved_date, last_usage_year
+                )
+                self.assertEqual(expiration_date, expected)
+                self.assertEqual(is_active, expected_active)
+
+    def test_calculate_expiration_date_function(self):
+        """Test the calculate_expiration_date function"""
+        self._assert_cases(
+            [
+                ("2022-01-15", 2025, "2028-01-01", True),  # with usage
+                ("2022-01-15", None, "2025-01-01", True),  # without usage
+                ("2020-01-15", None, "2023-01-01", False),  # expired
+                ("invalid-date", None, None, False),  # invalid date
+            ]
         )
-        expected_expiration = f"{future_year + 3}-01-01"
-        self.assertEqual(expiration_date, expected_expiration)
-        self.assertTrue(is_active)
 
-        # Test with current year usage
+    def test_expiration_date_calculation_edge_cases(self):
+        """Test expiration date calculation edge cases"""
         current_year = datetime.now().year
-        expiration_date, is_active = calculate_expiration_date(
-            "2022-01-15", current_year
+        future_year = current_year + 5
+        self._assert_cases(
+            [
+                # Very old reservation
+                ("1959-03-28", None, "1962-01-01", False),
+                # Future reservation
+                (f"{future_year}-01-01", None, f"{future_year + 3}-01-01", True),
+                # Current year usage
+                ("2022-01-15", current_year, f"{current_year + 3}-01-01", True),
+            ]
         )
-        expected_expiration = f"{current_year + 3}-01-01"
-        self.assertEqual(expiration_date, expected_expiration)
-        self.assertTrue(is_active)
 
 
 if __name__ == "__main__":
@@ -7,24 +7,77 @@ import unittest
 import sqlite3
 import os
 import tempfile
-import sys
 import json
-import shutil
 
-# Add the parent directory to the path so we can import app modules
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from init_production_db import (
+    INSERT_REGISTRATION_SQL,
+    _registration_row,
+    create_indexes,
+    create_schema,
+    init_production_database,
+)
 
-from init_production_db import init_production_database
+from tests._db import memory_db_uri
+
+# Lookup indexes init_production_database must create, checked with one set difference
+EXPECTED_INDEXES = frozenset(
+    {
+        "idx_car_number",
+        "idx_sort_order",
+        "idx_name",
+        "idx_status",
+        "idx_sort_order_car_number",
+    }
+)
 
 
 class DeploymentTestCase(unittest.TestCase):
     """Test cases for deployment functionality"""
 
+    @classmethod
+    def setUpClass(cls):
+        """Build a database with one existing registration once for the class"""
+        cls.template_conn = sqlite3.connect(memory_db_uri("template"), uri=True)
+        cls.addClassCleanup(cls.template_conn.close)
+        conn = cls.template_conn
+        cursor = conn.cursor()
+
+        # Create schema with the same DDL the production script uses
+        create_schema(cursor)
+
+        # Insert existing data
+        cursor.execute(
+            """
+            INSERT INTO car_registrations 
+            (first_name, last_name, car_number, sort_order, car_make, car_model, car_year, car_color, reserved_date, notes)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """,
+            (
+                "Old",
+                "Data",
+                "999",
+                999,
+                "Old",
+                "Car",
+                2019,
+                "Gray",
+                "2019-01-01",
+                "Old data",
+            ),
+        )
+
+        conn.commit()
+
     def setUp(self):
         """Set up test environment"""
-        # Create a temporary directory for test files
-        self.test_dir = tempfile.mkdtemp()
-        self.db_path = os.path.join(self.test_dir, "test_car_numbers.db")
+        # Create a temporary directory for the data files to import
+        self.test_dir = self.enterContext(tempfile.TemporaryDirectory())
+
+        # Keep the database itself in memory so commits never reach the disk;
+        # it lives only while a connection to it is open
+        self.db_path = memory_db_uri("test")
+        self.keepalive_conn = sqlite3.connect(self.db_path, uri=True)
+        self.addCleanup(self.keepalive_conn.close)
 
         # Create test data
         self.test_registrations = [
@@ -72,62 +125,15 @@ class DeploymentTestCase(unittest.TestCase):
             },
         ]
 
-    def tearDown(self):
-        """Clean up test environment"""
-        shutil.rmtree(self.test_dir)
-
     def test_init_production_database_no_data_file(self):
         """Test that init_production_database preserves existing data when no data file is provided"""
-        # First, create a database with some data
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-
-        # Create schema
-        cursor.execute(
-            """
-            CREATE TABLE car_registrations (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                first_name TEXT NOT NULL,
-                last_name TEXT NOT NULL,
-                car_number TEXT NOT NULL,
-                sort_order INTEGER,
-                car_make TEXT,
-                car_model TEXT,
-                car_year INTEGER,
-                car_color TEXT,
-                reserved_date TEXT,
-                reserved_for_year INTEGER,
-                status TEXT DEFAULT 'Active',
-                notes TEXT,
-                last_usage_year INTEGER,
-                expiration_date TEXT,
-                usage_count INTEGER DEFAULT 0,
-                is_active_in_period BOOLEAN DEFAULT 1,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        """
-        )
-
-        # Insert test data
-        cursor.execute(
-            """
-            INSERT INTO car_registrations 
-            (first_name, last_name, car_number, sort_order, car_make, car_model, car_year, car_color, reserved_date, notes)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        """,
-            ("John", "Doe", "1", 1, "BMW", "M3", 2020, "Black", "2020-01-15", "Test"),
-        )
-
-        conn.commit()
-        conn.close()
+        # Start from a copy of the seeded template database
+        self.template_conn.backup(self.keepalive_conn)
 
         # Verify data exists
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        cursor = self.keepalive_conn.cursor()
         cursor.execute("SELECT COUNT(*) FROM car_registrations")
         initial_count = cursor.fetchone()[0]
-        conn.close()
 
         self.assertEqual(initial_count, 1, "Initial data should exist")
 
@@ -137,78 +143,23 @@ class DeploymentTestCase(unittest.TestCase):
         self.assertTrue(success, "init_production_database should succeed")
 
         # Verify data is still there
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
         cursor.execute("SELECT COUNT(*) FROM car_registrations")
         final_count = cursor.fetchone()[0]
-        conn.close()
 
         self.assertEqual(final_count, 1, "Existing data should be preserved")
         self.assertEqual(initial_count, final_count, "Data count should not change")
 
     def test_init_production_database_with_json_data_file(self):
         """Test that init_production_database clears and loads data when JSON file is provided"""
-        # Create a database with existing data
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-
-        # Create schema
-        cursor.execute(
-            """
-            CREATE TABLE car_registrations (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                first_name TEXT NOT NULL,
-                last_name TEXT NOT NULL,
-                car_number TEXT NOT NULL,
-                sort_order INTEGER,
-                car_make TEXT,
-                car_model TEXT,
-                car_year INTEGER,
-                car_color TEXT,
-                reserved_date TEXT,
-                reserved_for_year INTEGER,
-                status TEXT DEFAULT 'Active',
-                notes TEXT,
-                last_usage_year INTEGER,
-                expiration_date TEXT,
-                usage_count INTEGER DEFAULT 0,
-                is_active_in_period BOOLEAN DEFAULT 1,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        """
-        )
-
-        # Insert existing data
-        cursor.execute(
-            """
-            INSERT INTO car_registrations 
-            (first_name, last_name, car_number, sort_order, car_make, car_model, car_year, car_color, reserved_date, notes)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        """,
-            (
-                "Old",
-                "Data",
-                "999",
-                999,
-                "Old",
-                "Car",
-                2019,
-                "Gray",
-                "2019-01-01",
-                "Old data",
-            ),
-        )
-
-        conn.commit()
-        conn.close()
+        # Start from a copy of the seeded template database
+        self.template_conn.backup(self.keepalive_conn)
 
         # Create JSON export file
         json_file = os.path.join(self.test_dir, "database_export.json")
         export_data = {"registrations": self.test_registrations}
 
         with open(json_file, "w") as f:
-            json.dump(export_data, f, indent=2)
+            json.dump(export_data, f)
 
         # Run init_production_database with JSON file
         success = init_production_database(self.db_path, json_file)
@@ -216,8 +167,7 @@ class DeploymentTestCase(unittest.TestCase):
         self.assertTrue(success, "init_production_database should succeed")
 
         # Verify data was cleared and replaced
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        cursor = self.keepalive_conn.cursor()
         cursor.execute("SELECT COUNT(*) FROM car_registrations")
         final_count = cursor.fetchone()[0]
 
@@ -226,7 +176,6 @@ class DeploymentTestCase(unittest.TestCase):
             "SELECT first_name, last_name FROM car_registrations ORDER BY id"
         )
         names = cursor.fetchall()
-        conn.close()
 
         self.assertEqual(final_count, 2, "Should have 2 registrations from JSON file")
         self.assertEqual(
@@ -236,73 +185,51 @@ class DeploymentTestCase(unittest.TestCase):
             names[1], ("Jane", "Smith"), "Second registration should be Jane Smith"
         )
 
-    def test_init_production_database_with_sql_data_file(self):
-        """Test that init_production_database clears and loads data when SQL file is provided"""
-        # Create a database with existing data
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+    def test_init_production_database_failed_import_keeps_existing_data(self):
+        """Test that a failed import rolls back and leaves existing data in place"""
+        # Start from a copy of the seeded template database
+        self.template_conn.backup(self.keepalive_conn)
 
-        # Create schema
-        cursor.execute(
-            """
-            CREATE TABLE car_registrations (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                first_name TEXT NOT NULL,
-                last_name TEXT NOT NULL,
-                car_number TEXT NOT NULL,
-                sort_order INTEGER,
-                car_make TEXT,
-                car_model TEXT,
-                car_year INTEGER,
-                car_color TEXT,
-                reserved_date TEXT,
-                reserved_for_year INTEGER,
-                status TEXT DEFAULT 'Active',
-                notes TEXT,
-                last_usage_year INTEGER,
-                expiration_date TEXT,
-                usage_count INTEGER DEFAULT 0,
-                is_active_in_period BOOLEAN DEFAULT 1,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        """
-        )
+        # Create a JSON export whose second registration is missing a field
+        broken_registration = dict(self.test_registrations[1])
+        del broken_registration["car_number"]
+        json_file = os.path.join(self.test_dir, "database_export.json")
+        export_data = {
+            "registrations": [self.test_registrations[0], broken_registration]
+        }
 
-        # Insert existing data
-        cursor.execute(
-            """
-            INSERT INTO car_registrations 
-            (first_name, last_name, car_number, sort_order, car_make, car_model, car_year, car_color, reserved_date, notes)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        """,
-            (
-                "Old",
-                "Data",
-                "999",
-                999,
-                "Old",
-                "Car",
-                2019,
-                "Gray",
-                "2019-01-01",
-                "Old data",
-            ),
-        )
+        with open(json_file, "w") as f:
+            json.dump(export_data, f)
 
-        conn.commit()
-        conn.close()
+        success = init_production_database(self.db_path, json_file)
+
+        self.assertFalse(success, "init_production_database should fail")
 
-        # Create SQL export file
+        # Verify the old data survived the rolled-back import
+        cursor = self.keepalive_conn.cursor()
+        cursor.execute("SELECT first_name, last_name FROM car_registrations")
+        self.assertEqual(
+            cursor.fetchall(), [("Old", "Data")], "Existing data should be preserved"
+        )
+
+    def test_init_production_database_with_sql_data_file(self):
+        """Test that init_production_database clears and loads data when SQL file is provided"""
+        # Start from a copy of the seeded template database
+        self.template_conn.backup(self.keepalive_conn)
+
+        # Create SQL export file by dumping the same registrations the JSON test uses
+        source = sqlite3.connect(":memory:")
+        self.addCleanup(source.close)
+        create_schema(source.cursor())
+        source.executemany(
+            INSERT_REGISTRATION_SQL,
+            map(_registration_row, self.test_registrations),
+        )
         sql_file = os.path.join(self.test_dir, "database_import.sql")
         with open(sql_file, "w") as f:
-            f.write("DELETE FROM car_registrations;\n")
-            f.write(
-                "INSERT INTO car_registrations (id, first_name, last_name, car_number, sort_order, car_make, car_model, car_year, car_color, reserved_date, reserved_for_year, status, notes, last_usage_year, expiration_date, usage_count, is_active_in_period, created_at, updated_at) VALUES (1, 'John', 'Doe', '1', 1, 'BMW', 'M3', 2020, 'Black', '2020-01-15', 2020, 'Active', 'Test note', 2024, '2027-12-31', 3, 1, '2020-01-15 10:00:00', '2024-01-15 10:00:00');\n"
-            )
-            f.write(
-                "INSERT INTO car_registrations (id, first_name, last_name, car_number, sort_order, car_make, car_model, car_year, car_color, reserved_date, reserved_for_year, status, notes, last_usage_year, expiration_date, usage_count, is_active_in_period, created_at, updated_at) VALUES (2, 'Jane', 'Smith', '001', 1, 'Porsche', '911', 2021, 'Red', '2021-02-20', 2021, 'Active', 'Another note', 2023, '2026-12-31', 2, 0, '2021-02-20 10:00:00', '2023-02-20 10:00:00');\n"
-            )
+            for line in source.iterdump():
+                if line.startswith('INSERT INTO "car_registrations"'):
+                    f.write(line + "\n")
 
         # Run init_production_database with SQL file
         success = init_production_database(self.db_path, sql_file)
@@ -310,8 +237,7 @@ class DeploymentTestCase(unittest.TestCase):
         self.assertTrue(success, "init_production_database should succeed")
 
         # Verify data was cleared and replaced
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        cursor = self.keepalive_conn.cursor()
         cursor.execute("SELECT COUNT(*) FROM car_registrations")
         final_count = cursor.fetchone()[0]
 
@@ -320,7 +246,6 @@ class DeploymentTestCase(unittest.TestCase):
             "SELECT first_name, last_name FROM car_registrations ORDER BY id"
         )
         names = cursor.fetchall()
-        conn.close()
 
         self.assertEqual(final_count, 2, "Should have 2 registrations from SQL file")
         self.assertEqual(
@@ -338,23 +263,26 @@ class DeploymentTestCase(unittest.TestCase):
         self.assertTrue(success, "init_production_database should succeed")
 
         # Check that indexes were created
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        cursor = self.keepalive_conn.cursor()
 
         cursor.execute("SELECT name FROM sqlite_master WHERE type='index'")
-        indexes = [row[0] for row in cursor.fetchall()]
+        indexes = {row[0] for row in cursor.fetchall()}
 
-        expected_indexes = [
-            "idx_car_number",
-            "idx_sort_order",
-            "idx_name",
-            "idx_status",
-        ]
+        missing = EXPECTED_INDEXES - indexes
+        self.assertFalse(missing, f"Indexes should be created: {missing}")
 
-        for index in expected_indexes:
-            self.assertIn(index, indexes, f"Index {index} should be created")
+    def test_create_indexes(self):
+        """Test that create_indexes builds the lookup indexes on its own"""
+        conn = sqlite3.connect(":memory:")
+        self.addCleanup(conn.close)
+        cursor = conn.cursor()
+        create_schema(cursor)
+
+        create_indexes(cursor)
 
-        conn.close()
+        cursor.execute("SELECT name FROM sqlite_master WHERE type='index'")
+        missing = EXPECTED_INDEXES - {row[0] for row in cursor.fetchall()}
+        self.assertFalse(missing, f"Indexes should be created: {missing}")
 
     def test_init_production_database_invalid_file_format(self):
         """Test that init_production_database handles invalid file formats gracefully"""
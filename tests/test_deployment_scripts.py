@@ -6,40 +6,59 @@ Tests for deployment script functionality in Nord Stern Car Numbers
 import unittest
 import os
 import tempfile
-import sys
+import re
 import shutil
-import subprocess
 import time
-from unittest.mock import patch, MagicMock
+from pathlib import Path
 
-# Add the parent directory to the path so we can import app modules
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+_EXPORT_FILES = frozenset(
+    {"database_export.json", "database_export.csv", "database_import.sql"}
+)
+
+
+def _read_if_exists(path):
+    """Return the contents of path, or None if the file does not exist"""
+    if not os.path.exists(path):
+        return None
+    with open(path, "r") as f:
+        return f.read()
+
+
+def _fast_copy(src, dst):
+    """Hardlink src to dst, copying only where linking is not possible"""
+    try:
+        os.link(src, dst)
+    except OSError:
+        shutil.copy2(src, dst)
 
 
 class DeploymentScriptsTestCase(unittest.TestCase):
     """Test cases for deployment script functionality"""
 
+    @classmethod
+    def setUpClass(cls):
+        """Create one scratch directory shared by every test in the class"""
+        cls.test_dir = cls.enterClassContext(tempfile.TemporaryDirectory())
+
     def setUp(self):
         """Set up test environment"""
-        self.test_dir = tempfile.mkdtemp()
-        self.original_cwd = os.getcwd()
-        os.chdir(self.test_dir)
-
-        # Create mock export files
-        self.export_files = [
-            "database_export.json",
-            "database_export.csv",
-            "database_import.sql",
-        ]
-
-        for file in self.export_files:
-            with open(file, "w") as f:
-                f.write(f"Mock content for {file}")
-
-    def tearDown(self):
-        """Clean up test environment"""
-        os.chdir(self.original_cwd)
-        shutil.rmtree(self.test_dir)
+        # Runs even when a test fails part-way through
+        self.addCleanup(self._clear_test_dir)
+
+    def _clear_test_dir(self):
+        """Empty the shared scratch directory for the next test"""
+        with os.scandir(self.test_dir) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    shutil.rmtree(entry.path)
+                else:
+                    os.unlink(entry.path)
+
+    def _populate(self, dirpath):
+        """Create mock export files in dirpath; only their presence is ever checked"""
+        for file in _EXPORT_FILES:
+            Path(dirpath, file).touch()
 
     def test_deploy_with_data_creates_temp_directory(self):
         """Test that deploy_with_data.sh creates temporary deployment directory"""
@@ -47,7 +66,7 @@ class DeploymentScriptsTestCase(unittest.TestCase):
         # We'll test the file operations without actually running the full script
 
         # Simulate the deployment directory creation logic
-        deploy_dir = f"deploy_temp_{int(time.time())}"
+        deploy_dir = os.path.join(self.test_dir, f"deploy_temp_{int(time.time())}")
         os.makedirs(deploy_dir, exist_ok=True)
 
         # Verify directory was created
@@ -55,33 +74,32 @@ class DeploymentScriptsTestCase(unittest.TestCase):
             os.path.exists(deploy_dir), "Deployment directory should be created"
         )
 
-        # Clean up
-        os.rmdir(deploy_dir)
-
     def test_deploy_with_data_copies_export_files(self):
         """Test that deploy_with_data.sh copies export files to deployment directory"""
+        self._populate(self.test_dir)
+
         # Create a mock deployment directory
-        deploy_dir = "test_deploy_dir"
+        deploy_dir = os.path.join(self.test_dir, "test_deploy_dir")
         os.makedirs(deploy_dir, exist_ok=True)
 
         # Simulate copying export files
-        for file in self.export_files:
-            if os.path.exists(file):
-                shutil.copy2(file, deploy_dir)
+        for file in _EXPORT_FILES:
+            source_file = os.path.join(self.test_dir, file)
+            if os.path.exists(source_file):
+                _fast_copy(source_file, os.path.join(deploy_dir, file))
 
         # Verify files were copied
-        for file in self.export_files:
+        for file in _EXPORT_FILES:
             deployed_file = os.path.join(deploy_dir, file)
             self.assertTrue(
                 os.path.exists(deployed_file),
                 f"Export file {file} should be copied to deployment directory",
             )
 
-        # Clean up
-        shutil.rmtree(deploy_dir)
-
     def test_deploy_with_data_excludes_export_files_from_main_copy(self):
         """Test that deploy_with_data.sh excludes export files from main file copy"""
+        self._populate(self.test_dir)
+
         # Create some additional files to simulate the full project
         additional_files = [
             "app.py",
@@ -91,21 +109,24 @@ class DeploymentScriptsTestCase(unittest.TestCase):
         ]
 
         for file in additional_files:
-            with open(file, "w") as f:
-                f.write(f"Mock content for {file}")
+            Path(self.test_dir, file).touch()
 
         # Create deployment directory
-        deploy_dir = "test_deploy_dir"
+        deploy_dir = os.path.join(self.test_dir, "test_deploy_dir")
         os.makedirs(deploy_dir, exist_ok=True)
 
         # Simulate rsync-like copy excluding export files
-        for file in os.listdir("."):
-            if file not in self.export_files and not file.startswith("test_"):
-                if os.path.isfile(file):
-                    shutil.copy2(file, deploy_dir)
+        with os.scandir(self.test_dir) as entries:
+            for entry in entries:
+                if (
+                    entry.name not in _EXPORT_FILES
+                    and not entry.name.startswith("test_")
+                    and entry.is_file()
+                ):
+                    _fast_copy(entry.path, os.path.join(deploy_dir, entry.name))
 
         # Verify export files are NOT in the main copy
-        for file in self.export_files:
+        for file in _EXPORT_FILES:
             deployed_file = os.path.join(deploy_dir, file)
             self.assertFalse(
                 os.path.exists(deployed_file),
@@ -120,18 +141,47 @@ class DeploymentScriptsTestCase(unittest.TestCase):
                 f"File {file} should be copied to deployment directory",
             )
 
-        # Clean up
-        shutil.rmtree(deploy_dir)
+
+class DeploymentScriptContentsTestCase(unittest.TestCase):
+    """Test cases for the contents of the deployment scripts and ignore files
+
+    These only read project files, so they need no per-test directory.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        """Read the inspected project files once for the whole class"""
+        cls.project_dir = os.getcwd()
+        cls._deploy_sh = _read_if_exists(os.path.join(cls.project_dir, "deploy.sh"))
+        cls._deploy_with_data_sh = _read_if_exists(
+            os.path.join(cls.project_dir, "deploy_with_data.sh")
+        )
+        cls._gitignore = _read_if_exists(os.path.join(cls.project_dir, ".gitignore"))
+        cls._gcloudignore = _read_if_exists(
+            os.path.join(cls.project_dir, ".gcloudignore")
+        )
+
+    def _assert_all_in(self, needles, haystack, msg):
+        """Assert every needle occurs in haystack with a single regex scan
+
+        The lookahead lets matches overlap, so only needles sharing a start
+        position can hide one another.
+        """
+        pattern = re.compile(
+            "(?=(" + "|".join(re.escape(needle) for needle in needles) + "))"
+        )
+        found = set(pattern.findall(haystack))
+        for needle in needles:
+            self.assertIn(needle, found, f"{msg} {needle}")
 
     def test_deploy_script_does_not_touch_local_export_files(self):
         """Test that deploy.sh does not create or modify local export files"""
         # This test verifies that deploy.sh doesn't create local export files
         # We'll check that the script doesn't reference local export file operations
 
-        # Read the deploy.sh script to verify it doesn't mention local export files
-        deploy_script_path = os.path.join(self.original_cwd, "deploy.sh")
-        with open(deploy_script_path, "r") as f:
-            script_content = f.read()
+        script_content = self._deploy_sh
+        if script_content is None:
+            self.skipTest("deploy.sh not found")
 
         # Verify script doesn't mention local export file operations (but can exclude them)
         local_export_file_operations = [
@@ -147,9 +197,9 @@ class DeploymentScriptsTestCase(unittest.TestCase):
 
     def test_deploy_script_data_preservation_mechanism(self):
         """Test that deploy.sh includes data preservation mechanism"""
-        deploy_script_path = os.path.join(self.original_cwd, "deploy.sh")
-        with open(deploy_script_path, "r") as f:
-            script_content = f.read()
+        script_content = self._deploy_sh
+        if script_content is None:
+            self.skipTest("deploy.sh not found")
 
         # Verify script includes data preservation features
         preservation_features = [
@@ -158,16 +208,15 @@ class DeploymentScriptsTestCase(unittest.TestCase):
             "Preserving current production data",
         ]
 
-        for feature in preservation_features:
-            self.assertIn(
-                feature, script_content, f"deploy.sh should include {feature}"
-            )
+        self._assert_all_in(
+            preservation_features, script_content, "deploy.sh should include"
+        )
 
     def test_deploy_script_api_export_endpoint(self):
         """Test that deploy.sh uses the API export endpoint"""
-        deploy_script_path = os.path.join(self.original_cwd, "deploy.sh")
-        with open(deploy_script_path, "r") as f:
-            script_content = f.read()
+        script_content = self._deploy_sh
+        if script_content is None:
+            self.skipTest("deploy.sh not found")
 
         # Verify script uses the API export endpoint
         self.assertIn(
@@ -176,9 +225,9 @@ class DeploymentScriptsTestCase(unittest.TestCase):
 
     def test_deploy_script_backup_file_handling(self):
         """Test that deploy.sh properly handles backup files"""
-        deploy_script_path = os.path.join(self.original_cwd, "deploy.sh")
-        with open(deploy_script_path, "r") as f:
-            script_content = f.read()
+        script_content = self._deploy_sh
+        if script_content is None:
+            self.skipTest("deploy.sh not found")
 
         # Verify backup file handling
         backup_handling = [
@@ -187,100 +236,60 @@ class DeploymentScriptsTestCase(unittest.TestCase):
             "Creating custom .gcloudignore for data preservation",
         ]
 
-        for handling in backup_handling:
-            self.assertIn(
-                handling, script_content, f"deploy.sh should handle {handling}"
-            )
+        self._assert_all_in(backup_handling, script_content, "deploy.sh should handle")
 
     def test_deploy_script_excludes_export_files_from_copy(self):
         """Test that deploy.sh excludes export files from main copy"""
-        deploy_script_path = os.path.join(self.original_cwd, "deploy.sh")
-        with open(deploy_script_path, "r") as f:
-            script_content = f.read()
+        script_content = self._deploy_sh
+        if script_content is None:
+            self.skipTest("deploy.sh not found")
 
         # Verify export files are excluded from main copy
-        excluded_files = [
-            "database_export.json",
-            "database_export.csv",
-            "database_import.sql",
-        ]
-
-        for file in excluded_files:
-            self.assertIn(
-                f"--exclude='{file}'",
-                script_content,
-                f"deploy.sh should exclude {file} from main copy",
-            )
+        self._assert_all_in(
+            [f"--exclude='{file}'" for file in _EXPORT_FILES],
+            script_content,
+            "deploy.sh should exclude from main copy:",
+        )
 
     def test_deploy_with_data_script_mentions_export_files(self):
         """Test that deploy_with_data.sh properly handles export files"""
-        # Read the deploy_with_data.sh script to verify it mentions export files
-        deploy_script_path = os.path.join(self.original_cwd, "deploy_with_data.sh")
-
-        if os.path.exists(deploy_script_path):
-            with open(deploy_script_path, "r") as f:
-                script_content = f.read()
-
-            # Verify script mentions export files
-            export_file_mentions = [
-                "database_export.json",
-                "database_export.csv",
-                "database_import.sql",
-            ]
-
-            for mention in export_file_mentions:
-                self.assertIn(
-                    mention,
-                    script_content,
-                    f"deploy_with_data.sh should mention {mention}",
-                )
+        script_content = self._deploy_with_data_sh
+        if script_content is None:
+            self.skipTest("deploy_with_data.sh not found")
+
+        # Verify script mentions export files
+        self._assert_all_in(
+            _EXPORT_FILES, script_content, "deploy_with_data.sh should mention"
+        )
 
     def test_gitignore_excludes_export_files(self):
         """Test that .gitignore properly excludes export files"""
-        gitignore_path = os.path.join(self.original_cwd, ".gitignore")
-
-        if os.path.exists(gitignore_path):
-            with open(gitignore_path, "r") as f:
-                gitignore_content = f.read()
-
-            # Verify export files are excluded
-            export_files = [
-                "database_export.json",
-                "database_export.csv",
-                "database_import.sql",
-            ]
+        gitignore_content = self._gitignore
+        if gitignore_content is None:
+            self.skipTest(".gitignore not found")
 
-            for file in export_files:
-                self.assertIn(
-                    file, gitignore_content, f".gitignore should exclude {file}"
-                )
+        # Verify export files are excluded
+        self._assert_all_in(
+            _EXPORT_FILES, gitignore_content, ".gitignore should exclude"
+        )
 
     def test_gcloudignore_excludes_export_files(self):
         """Test that .gcloudignore properly excludes export files"""
-        gcloudignore_path = os.path.join(self.original_cwd, ".gcloudignore")
-
-        if os.path.exists(gcloudignore_path):
-            with open(gcloudignore_path, "r") as f:
-                gcloudignore_content = f.read()
+        gcloudignore_content = self._gcloudignore
+        if gcloudignore_content is None:
+            self.skipTest(".gcloudignore not found")
 
-            # Verify export files are excluded
-            export_files = [
-                "database_export.json",
-                "database_export.csv",
-                "database_import.sql",
-            ]
-
-            for file in export_files:
-                self.assertIn(
-                    file, gcloudignore_content, f".gcloudignore should exclude {file}"
-                )
+        # Verify export files are excluded
+        self._assert_all_in(
+            _EXPORT_FILES, gcloudignore_content, ".gcloudignore should exclude"
+        )
 
     def test_deployment_scripts_are_executable(self):
         """Test that deployment scripts are executable"""
         scripts = ["deploy.sh", "deploy_with_data.sh"]
 
         for script in scripts:
-            script_path = os.path.join(self.original_cwd, script)
+            script_path = os.path.join(self.project_dir, script)
             if os.path.exists(script_path):
                 # Check if file is executable
                 is_executable = os.access(script_path, os.X_OK)
@@ -5,112 +5,125 @@ Tests for export and import functionality in Nord Stern Car Numbers
 
 import unittest
 import sqlite3
-import os
-import tempfile
-import sys
 import json
 
-# Add the parent directory to the path so we can import app modules
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-
 from app import init_db
 
+from tests._db import copy_to_memory, memory_db_uri
+
+
+_INSERT_SQL = (
+    "INSERT INTO car_registrations "
+    "(first_name, last_name, car_number, sort_order, car_make, car_model, "
+    "car_year, car_color, reserved_date, notes, last_usage_year, usage_count, "
+    "is_active_in_period) "
+    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)"
+)
+
+
+# Registrations in _INSERT_SQL column order; sorted export order is Jane then John
+_TEST_ROWS = (
+    (
+        "John",
+        "Doe",
+        "1",
+        1,
+        "BMW",
+        "M3",
+        2020,
+        "Black",
+        "2020-01-15",
+        "Test note",
+        2024,
+        3,
+        1,
+    ),
+    (
+        "Jane",
+        "Smith",
+        "001",
+        1,
+        "Porsche",
+        "911",
+        2021,
+        "Red",
+        "2021-02-20",
+        "Another note",
+        2023,
+        2,
+        0,
+    ),
+)
+
+# Records shaped like the JSON export, as an import would receive them
+_EXPORT_DATA = (
+    {
+        "id": 1,
+        "first_name": "John",
+        "last_name": "Doe",
+        "car_number": "1",
+        "sort_order": 1,
+        "car_make": "BMW",
+        "car_model": "M3",
+        "car_year": 2020,
+        "car_color": "Black",
+        "reserved_date": "2020-01-15",
+        "reserved_for_year": 2025,
+        "status": "Active",
+        "notes": "Test note",
+        "last_usage_year": 2024,
+        "expiration_date": "2029-01-15",
+        "usage_count": 3,
+        "is_active_in_period": 1,
+        "created_at": "2025-01-15 10:30:00",
+        "updated_at": "2025-01-15 10:30:00",
+    },
+    {
+        "id": 2,
+        "first_name": "Jane",
+        "last_name": "Smith",
+        "car_number": "001",
+        "sort_order": 1,
+        "car_make": "Porsche",
+        "car_model": "911",
+        "car_year": 2021,
+        "car_color": "Red",
+        "reserved_date": "2021-02-20",
+        "reserved_for_year": 2025,
+        "status": "Active",
+        "notes": "Another note",
+        "last_usage_year": 2023,
+        "expiration_date": "2028-02-20",
+        "usage_count": 2,
+        "is_active_in_period": 0,
+        "created_at": "2025-01-15 11:15:00",
+        "updated_at": "2025-01-15 11:15:00",
+    },
+)
+
 
 class ExportImportTestCase(unittest.TestCase):
     """Test cases for export and import functionality"""
 
+    @classmethod
+    def setUpClass(cls):
+        """Initialize the schema once into a template database"""
+        template_path = memory_db_uri("template")
+        cls.template_conn = sqlite3.connect(template_path, uri=True)
+        cls.addClassCleanup(cls.template_conn.close)
+        init_db(template_path)
+
     def setUp(self):
         """Set up test database"""
-        # Create a temporary database for testing
-        self.db_fd, self.db_path = tempfile.mkstemp()
-        self.db_conn = sqlite3.connect(self.db_path)
+        self.db_path, self.db_conn = copy_to_memory(self, self.template_conn)
+        self.db_conn.row_factory = sqlite3.Row
         self.cursor = self.db_conn.cursor()
 
-        # Initialize the database
-        init_db(self.db_path)
-
-    def tearDown(self):
-        """Clean up test database"""
-        self.db_conn.close()
-        os.close(self.db_fd)
-        os.unlink(self.db_path)
-
     def test_export_database_structure(self):
         """Test that export includes all required fields"""
         # Insert test data
-        test_data = [
-            (
-                "John",
-                "Doe",
-                "1",
-                1,
-                "BMW",
-                "M3",
-                2020,
-                "Black",
-                "2020-01-15",
-                "Test note",
-                2024,
-                3,
-                1,
-            ),
-            (
-                "Jane",
-                "Smith",
-                "001",
-                1,
-                "Porsche",
-                "911",
-                2021,
-                "Red",
-                "2021-02-20",
-                "Another note",
-                2023,
-                2,
-                0,
-            ),
-        ]
-
-        for (
-            first_name,
-            last_name,
-            car_number,
-            sort_order,
-            car_make,
-            car_model,
-            car_year,
-            car_color,
-            reserved_date,
-            notes,
-            last_usage_year,
-            usage_count,
-            is_active_in_period,
-        ) in test_data:
-            self.cursor.execute(
-                """
-                INSERT INTO car_registrations 
-                (first_name, last_name, car_number, sort_order, car_make, car_model, car_year, car_color, 
-                 reserved_date, notes, last_usage_year, usage_count, is_active_in_period)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """,
-                (
-                    first_name,
-                    last_name,
-                    car_number,
-                    sort_order,
-                    car_make,
-                    car_model,
-                    car_year,
-                    car_color,
-                    reserved_date,
-                    notes,
-                    last_usage_year,
-                    usage_count,
-                    is_active_in_period,
-                ),
-            )
-
-        self.db_conn.commit()
+        with self.db_conn:
+            self.cursor.executemany(_INSERT_SQL, _TEST_ROWS)
 
         # Test export query structure
         self.cursor.execute(
@@ -156,79 +169,8 @@ class ExportImportTestCase(unittest.TestCase):
     def test_export_data_integrity(self):
         """Test that exported data maintains integrity"""
         # Insert test data
-        test_data = [
-            (
-                "John",
-                "Doe",
-                "1",
-                1,
-                "BMW",
-                "M3",
-                2020,
-                "Black",
-                "2020-01-15",
-                "Test note",
-                2024,
-                3,
-                1,
-            ),
-            (
-                "Jane",
-                "Smith",
-                "001",
-                1,
-                "Porsche",
-                "911",
-                2021,
-                "Red",
-                "2021-02-20",
-                "Another note",
-                2023,
-                2,
-                0,
-            ),
-        ]
-
-        for (
-            first_name,
-            last_name,
-            car_number,
-            sort_order,
-            car_make,
-            car_model,
-            car_year,
-            car_color,
-            reserved_date,
-            notes,
-            last_usage_year,
-            usage_count,
-            is_active_in_period,
-        ) in test_data:
-            self.cursor.execute(
-                """
-                INSERT INTO car_registrations 
-                (first_name, last_name, car_number, sort_order, car_make, car_model, car_year, car_color, 
-                 reserved_date, notes, last_usage_year, usage_count, is_active_in_period)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """,
-                (
-                    first_name,
-                    last_name,
-                    car_number,
-                    sort_order,
-                    car_make,
-                    car_model,
-                    car_year,
-                    car_color,
-                    reserved_date,
-                    notes,
-                    last_usage_year,
-                    usage_count,
-                    is_active_in_period,
-                ),
-            )
-
-        self.db_conn.commit()
+        with self.db_conn:
+            self.cursor.executemany(_INSERT_SQL, _TEST_ROWS)
 
         # Export data
         self.cursor.execute(
@@ -246,66 +188,20 @@ class ExportImportTestCase(unittest.TestCase):
 
         # Verify data integrity (results are sorted by sort_order, car_number)
         # First result should be "001" (Jane), second should be "1" (John)
-        self.assertEqual(results[0][1], test_data[1][0])  # first_name (Jane)
-        self.assertEqual(results[0][2], test_data[1][1])  # last_name (Smith)
-        self.assertEqual(results[0][3], test_data[1][2])  # car_number (001)
-        self.assertEqual(results[0][4], test_data[1][3])  # sort_order (1)
+        self.assertEqual(results[0][1], _TEST_ROWS[1][0])  # first_name (Jane)
+        self.assertEqual(results[0][2], _TEST_ROWS[1][1])  # last_name (Smith)
+        self.assertEqual(results[0][3], _TEST_ROWS[1][2])  # car_number (001)
+        self.assertEqual(results[0][4], _TEST_ROWS[1][3])  # sort_order (1)
 
-        self.assertEqual(results[1][1], test_data[0][0])  # first_name (John)
-        self.assertEqual(results[1][2], test_data[0][1])  # last_name (Doe)
-        self.assertEqual(results[1][3], test_data[0][2])  # car_number (1)
-        self.assertEqual(results[1][4], test_data[0][3])  # sort_order (1)
+        self.assertEqual(results[1][1], _TEST_ROWS[0][0])  # first_name (John)
+        self.assertEqual(results[1][2], _TEST_ROWS[0][1])  # last_name (Doe)
+        self.assertEqual(results[1][3], _TEST_ROWS[0][2])  # car_number (1)
+        self.assertEqual(results[1][4], _TEST_ROWS[0][3])  # sort_order (1)
 
     def test_import_data_structure(self):
         """Test that import can handle the exported data structure"""
-        # Create test export data
-        export_data = [
-            {
-                "id": 1,
-                "first_name": "John",
-                "last_name": "Doe",
-                "car_number": "1",
-                "sort_order": 1,
-                "car_make": "BMW",
-                "car_model": "M3",
-                "car_year": 2020,
-                "car_color": "Black",
-                "reserved_date": "2020-01-15",
-                "reserved_for_year": 2025,
-                "status": "Active",
-                "notes": "Test note",
-                "last_usage_year": 2024,
-                "expiration_date": "2029-01-15",
-                "usage_count": 3,
-                "is_active_in_period": 1,
-                "created_at": "2025-01-15 10:30:00",
-                "updated_at": "2025-01-15 10:30:00",
-            },
-            {
-                "id": 2,
-                "first_name": "Jane",
-                "last_name": "Smith",
-                "car_number": "001",
-                "sort_order": 1,
-                "car_make": "Porsche",
-                "car_model": "911",
-                "car_year": 2021,
-                "car_color": "Red",
-                "reserved_date": "2021-02-20",
-                "reserved_for_year": 2025,
-                "status": "Active",
-                "notes": "Another note",
-                "last_usage_year": 2023,
-                "expiration_date": "2028-02-20",
-                "usage_count": 2,
-                "is_active_in_period": 0,
-                "created_at": "2025-01-15 11:15:00",
-                "updated_at": "2025-01-15 11:15:00",
-            },
-        ]
-
         # Test that the data structure is valid for import
-        for record in export_data:
+        for record in _EXPORT_DATA:
             # Check required fields
             required_fields = ["first_name", "last_name", "car_number", "sort_order"]
             for field in required_fields:
@@ -320,65 +216,9 @@ class ExportImportTestCase(unittest.TestCase):
 
     def test_export_json_format(self):
         """Test that export data can be converted to JSON format"""
-        # Insert test data
-        test_data = [
-            (
-                "John",
-                "Doe",
-                "1",
-                1,
-                "BMW",
-                "M3",
-                2020,
-                "Black",
-                "2020-01-15",
-                "Test note",
-                2024,
-                3,
-                1,
-            ),
-        ]
-
-        for (
-            first_name,
-            last_name,
-            car_number,
-            sort_order,
-            car_make,
-            car_model,
-            car_year,
-            car_color,
-            reserved_date,
-            notes,
-            last_usage_year,
-            usage_count,
-            is_active_in_period,
-        ) in test_data:
-            self.cursor.execute(
-                """
-                INSERT INTO car_registrations 
-                (first_name, last_name, car_number, sort_order, car_make, car_model, car_year, car_color, 
-                 reserved_date, notes, last_usage_year, usage_count, is_active_in_period)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """,
-                (
-                    first_name,
-                    last_name,
-                    car_number,
-                    sort_order,
-                    car_make,
-                    car_model,
-                    car_year,
-                    car_color,
-                    reserved_date,
-                    notes,
-                    last_usage_year,
-                    usage_count,
-                    is_active_in_period,
-                ),
-            )
-
-        self.db_conn.commit()
+        # Insert test data (John only)
+        with self.db_conn:
+            self.cursor.executemany(_INSERT_SQL, _TEST_ROWS[:1])
 
         # Export data
         self.cursor.execute(
@@ -394,33 +234,8 @@ class ExportImportTestCase(unittest.TestCase):
 
         results = self.cursor.fetchall()
 
-        # Convert to JSON format
-        columns = [
-            "id",
-            "first_name",
-            "last_name",
-            "car_number",
-            "sort_order",
-            "car_make",
-            "car_model",
-            "car_year",
-            "car_color",
-            "reserved_date",
-            "reserved_for_year",
-            "status",
-            "notes",
-            "last_usage_year",
-            "expiration_date",
-            "usage_count",
-            "is_active_in_period",
-            "created_at",
-            "updated_at",
-        ]
-
-        json_data = []
-        for row in results:
-            record = dict(zip(columns, row))
-            json_data.append(record)
+        # Convert to JSON format; sqlite3.Row already maps column names to values
+        json_data = [dict(row) for row in results]
 
         # Test JSON serialization
         try:
@@ -5,56 +5,69 @@ Tests for migration scripts in Nord Stern Car Numbers
 
 import unittest
 import sqlite3
-import os
-import tempfile
-import sys
-
-# Add the parent directory to the path so we can import app modules
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from app import init_db
 
+from tests._db import copy_to_memory, memory_db_uri
+
+
+_INSERT_SQL = (
+    "INSERT INTO car_registrations "
+    "(first_name, last_name, car_number, car_make, car_model, car_year, "
+    "car_color, reserved_date, notes) "
+    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)"
+)
+
+# Car details shared by every row the migration tests insert
+_CAR_DETAILS = ("Test", "Model", 2020, "Red", None, "Test note")
+
 
 class MigrationTestCase(unittest.TestCase):
     """Test cases for migration functionality"""
 
+    @classmethod
+    def setUpClass(cls):
+        """Initialize the schema once into a template database"""
+        template_path = memory_db_uri("template")
+        cls.template_conn = sqlite3.connect(template_path, uri=True)
+        cls.addClassCleanup(cls.template_conn.close)
+        init_db(template_path)
+
     def setUp(self):
         """Set up test database"""
-        # Create a temporary database for testing
-        self.db_fd, self.db_path = tempfile.mkstemp()
-        self.db_conn = sqlite3.connect(self.db_path)
+        self.db_path, self.db_conn = copy_to_memory(self, self.template_conn)
         self.cursor = self.db_conn.cursor()
 
-        # Initialize the database
-        init_db(self.db_path)
+    def _migrate_sort_order(self, car_numbers):
+        """Simulate the sort_order migration with a single CASE-based UPDATE
+
+        All-digit car numbers get their integer value; anything else falls through
+        to ELSE 0, just as a failed int() does in the migration.
+        """
+        params = []
+        for car_number in set(car_numbers):
+            if car_number.isdecimal():
+                params += [car_number, int(car_number)]
 
-    def tearDown(self):
-        """Clean up test database"""
-        self.db_conn.close()
-        os.close(self.db_fd)
-        os.unlink(self.db_path)
+        cases = " ".join(["WHEN ? THEN ?"] * (len(params) // 2))
+        with self.db_conn:
+            self.cursor.execute(
+                "UPDATE car_registrations "
+                f"SET sort_order = CASE car_number {cases} ELSE 0 END",
+                params,
+            )
 
     def test_migrate_sort_order_column_addition(self):
         """Test that sort_order column is added correctly"""
-        # Check if sort_order column exists
-        self.cursor.execute("PRAGMA table_info(car_registrations)")
-        columns = [column[1] for column in self.cursor.fetchall()]
-
-        # sort_order should be in the columns list
-        self.assertIn("sort_order", columns)
-
-        # Get column details
-        self.cursor.execute("PRAGMA table_info(car_registrations)")
-        column_info = self.cursor.fetchall()
-
-        sort_order_column = None
-        for column in column_info:
-            if column[1] == "sort_order":
-                sort_order_column = column
-                break
+        # Look up just the sort_order column; no row means the column is missing
+        self.cursor.execute(
+            "SELECT type FROM pragma_table_info('car_registrations') "
+            "WHERE name = 'sort_order'"
+        )
+        sort_order_column = self.cursor.fetchone()
 
         self.assertIsNotNone(sort_order_column)
-        self.assertEqual(sort_order_column[2], "INTEGER")  # Data type
+        self.assertEqual(sort_order_column[0], "INTEGER")  # Data type
 
     def test_migrate_sort_order_population(self):
         """Test that sort_order is populated correctly for existing data"""
@@ -67,48 +80,17 @@ class MigrationTestCase(unittest.TestCase):
             ("Charlie", "Wilson", "99"),
         ]
 
-        for first_name, last_name, car_number in test_data:
-            self.cursor.execute(
-                """
-                INSERT INTO car_registrations 
-                (first_name, last_name, car_number, car_make, car_model, car_year, car_color, reserved_date, notes)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """,
-                (
-                    first_name,
-                    last_name,
-                    car_number,
-                    "Test",
-                    "Model",
-                    2020,
-                    "Red",
-                    None,
-                    "Test note",
-                ),
+        with self.db_conn:
+            self.cursor.executemany(
+                _INSERT_SQL,
+                [
+                    (first_name, last_name, car_number, *_CAR_DETAILS)
+                    for first_name, last_name, car_number in test_data
+                ],
             )
 
-        self.db_conn.commit()
-
         # Now simulate the migration by updating sort_order
-        self.cursor.execute("SELECT id, car_number FROM car_registrations")
-        registrations = self.cursor.fetchall()
-
-        for reg_id, car_number in registrations:
-            try:
-                sort_order = int(car_number)
-            except ValueError:
-                sort_order = 0
-
-            self.cursor.execute(
-                """
-                UPDATE car_registrations 
-                SET sort_order = ? 
-                WHERE id = ?
-            """,
-                (sort_order, reg_id),
-            )
-
-        self.db_conn.commit()
+        self._migrate_sort_order(car_number for _, _, car_number in test_data)
 
         # Verify the migration
         self.cursor.execute(
@@ -135,48 +117,17 @@ class MigrationTestCase(unittest.TestCase):
             ("Alice", "Brown", "not-a-number"),
         ]
 
-        for first_name, last_name, car_number in test_data:
-            self.cursor.execute(
-                """
-                INSERT INTO car_registrations 
-                (first_name, last_name, car_number, car_make, car_model, car_year, car_color, reserved_date, notes)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """,
-                (
-                    first_name,
-                    last_name,
-                    car_number,
-                    "Test",
-                    "Model",
-                    2020,
-                    "Red",
-                    None,
-                    "Test note",
-                ),
+        with self.db_conn:
+            self.cursor.executemany(
+                _INSERT_SQL,
+                [
+                    (first_name, last_name, car_number, *_CAR_DETAILS)
+                    for first_name, last_name, car_number in test_data
+                ],
             )
 
-        self.db_conn.commit()
-
         # Simulate migration
-        self.cursor.execute("SELECT id, car_number FROM car_registrations")
-        registrations = self.cursor.fetchall()
-
-        for reg_id, car_number in registrations:
-            try:
-                sort_order = int(car_number)
-            except ValueError:
-                sort_order = 0
-
-            self.cursor.execute(
-                """
-                UPDATE car_registrations 
-                SET sort_order = ? 
-                WHERE id = ?
-            """,
-                (sort_order, reg_id),
-            )
-
-        self.db_conn.commit()
+        self._migrate_sort_order(car_number for _, _, car_number in test_data)
 
         # Verify the migration
         self.cursor.execute(
@@ -209,48 +160,17 @@ class MigrationTestCase(unittest.TestCase):
             ("Jane", "Smith", "001"),
         ]
 
-        for first_name, last_name, car_number in test_data:
-            self.cursor.execute(
-                """
-                INSERT INTO car_registrations 
-                (first_name, last_name, car_number, car_make, car_model, car_year, car_color, reserved_date, notes)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """,
-                (
-                    first_name,
-                    last_name,
-                    car_number,
-                    "Test",
-                    "Model",
-                    2020,
-                    "Red",
-                    None,
-                    "Test note",
-                ),
+        with self.db_conn:
+            self.cursor.executemany(
+                _INSERT_SQL,
+                [
+                    (first_name, last_name, car_number, *_CAR_DETAILS)
+                    for first_name, last_name, car_number in test_data
+                ],
             )
 
-        self.db_conn.commit()
-
         # Migrate
-        self.cursor.execute("SELECT id, car_number FROM car_registrations")
-        registrations = self.cursor.fetchall()
-
-        for reg_id, car_number in registrations:
-            try:
-                sort_order = int(car_number)
-            except ValueError:
-                sort_order = 0
-
-            self.cursor.execute(
-                """
-                UPDATE car_registrations 
-                SET sort_order = ? 
-                WHERE id = ?
-            """,
-                (sort_order, reg_id),
-            )
-
-        self.db_conn.commit()
+        self._migrate_sort_order(car_number for _, _, car_number in test_data)
 
         # Verify sorting works correctly
         self.cursor.execute(
@@ -5,35 +5,40 @@ Tests for sort_order functionality in Nord Stern Car Numbers
 
 import unittest
 import sqlite3
-import os
-import tempfile
-import sys
-
-# Add the parent directory to the path so we can import app modules
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from app import init_db, calculate_expiration_date
 
+from tests._db import copy_to_memory, maybe_trace, memory_db_uri
+
+
+_INSERT_SQL = (
+    "INSERT INTO car_registrations "
+    "(first_name, last_name, car_number, sort_order, car_make, car_model, "
+    "car_year, car_color, reserved_date, notes) "
+    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)"
+)
+
+# Car details shared by every row the sort_order tests insert
+_CAR_DETAILS = ("Test", "Model", 2020, "Red", None, "Test note")
+
 
 class SortOrderTestCase(unittest.TestCase):
     """Test cases for sort_order functionality"""
 
+    @classmethod
+    def setUpClass(cls):
+        """Initialize the schema once into a template database"""
+        template_path = memory_db_uri("template")
+        cls.template_conn = sqlite3.connect(template_path, uri=True)
+        cls.addClassCleanup(cls.template_conn.close)
+        init_db(template_path)
+
     def setUp(self):
         """Set up test database"""
-        # Create a temporary database for testing
-        self.db_fd, self.db_path = tempfile.mkstemp()
-        self.db_conn = sqlite3.connect(self.db_path)
+        self.db_path, self.db_conn = copy_to_memory(self, self.template_conn)
+        maybe_trace(self.db_conn)
         self.cursor = self.db_conn.cursor()
 
-        # Initialize the database
-        init_db(self.db_path)
-
-    def tearDown(self):
-        """Clean up test database"""
-        self.db_conn.close()
-        os.close(self.db_fd)
-        os.unlink(self.db_path)
-
     def test_sort_order_calculation(self):
         """Test that sort_order is calculated correctly from car_number"""
         test_cases = [
@@ -47,13 +52,11 @@ class SortOrderTestCase(unittest.TestCase):
             ("999", 999),
         ]
 
-        for car_number, expected_sort_order in test_cases:
-            with self.subTest(car_number=car_number):
-                try:
-                    sort_order = int(car_number)
-                    self.assertEqual(sort_order, expected_sort_order)
-                except ValueError:
-                    self.fail(f"Could not convert car_number '{car_number}' to integer")
+        # One list comparison; a failure reports the first mismatched index
+        self.assertListEqual(
+            [int(car_number) for car_number, _ in test_cases],
+            [expected_sort_order for _, expected_sort_order in test_cases],
+        )
 
     def test_sort_order_insertion(self):
         """Test that sort_order is properly inserted when adding registrations"""
@@ -65,35 +68,18 @@ class SortOrderTestCase(unittest.TestCase):
             ("Charlie", "Wilson", "99", 99),
         ]
 
-        for first_name, last_name, car_number, expected_sort_order in test_data:
+        rows = []
+        for first_name, last_name, car_number, _ in test_data:
             # Calculate sort_order
             try:
                 sort_order = int(car_number)
             except ValueError:
                 sort_order = 0
+            rows.append((first_name, last_name, car_number, sort_order, *_CAR_DETAILS))
 
-            # Insert registration
-            self.cursor.execute(
-                """
-                INSERT INTO car_registrations 
-                (first_name, last_name, car_number, sort_order, car_make, car_model, car_year, car_color, reserved_date, notes)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """,
-                (
-                    first_name,
-                    last_name,
-                    car_number,
-                    sort_order,
-                    "Test",
-                    "Model",
-                    2020,
-                    "Red",
-                    None,
-                    "Test note",
-                ),
-            )
-
-        self.db_conn.commit()
+        # Insert registrations
+        with self.db_conn:
+            self.cursor.executemany(_INSERT_SQL, rows)
 
         # Verify sort_order values
         self.cursor.execute(
@@ -101,13 +87,10 @@ class SortOrderTestCase(unittest.TestCase):
         )
         results = self.cursor.fetchall()
 
-        for i, (car_number, sort_order) in enumerate(results):
-            expected_sort_order = test_data[i][3]
-            self.assertEqual(
-                sort_order,
-                expected_sort_order,
-                f"sort_order mismatch for car_number '{car_number}': expected {expected_sort_order}, got {sort_order}",
-            )
+        self.assertEqual(
+            results,
+            [(car_number, sort_order) for _, _, car_number, sort_order in test_data],
+        )
 
     def test_sorting_by_sort_order(self):
         """Test that registrations are sorted correctly by sort_order"""
@@ -120,29 +103,12 @@ class SortOrderTestCase(unittest.TestCase):
             ("Jane", "Smith", "001", 1),
         ]
 
-        for first_name, last_name, car_number, sort_order in test_data:
-            self.cursor.execute(
-                """
-                INSERT INTO car_registrations 
-                (first_name, last_name, car_number, sort_order, car_make, car_model, car_year, car_color, reserved_date, notes)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """,
-                (
-                    first_name,
-                    last_name,
-                    car_number,
-                    sort_order,
-                    "Test",
-                    "Model",
-                    2020,
-                    "Red",
-                    None,
-                    "Test note",
-                ),
+        with self.db_conn:
+            self.cursor.executemany(
+                _INSERT_SQL,
+                [(*registration, *_CAR_DETAILS) for registration in test_data],
             )
 
-        self.db_conn.commit()
-
         # Query with ORDER BY sort_order, car_number
         self.cursor.execute(
             """
@@ -154,14 +120,9 @@ class SortOrderTestCase(unittest.TestCase):
         results = self.cursor.fetchall()
 
         # Expected order: 001, 1, 014, 14, 99 (alphabetical within same sort_order)
-        expected_order = ["001", "1", "014", "14", "99"]
-
-        for i, (car_number, sort_order, first_name, last_name) in enumerate(results):
-            self.assertEqual(
-                car_number,
-                expected_order[i],
-                f"Sorting order mismatch at position {i}: expected {expected_order[i]}, got {car_number}",
-            )
+        self.assertEqual(
+            tuple(row[0] for row in results), ("001", "1", "014", "14", "99")
+        )
 
     def test_duplicate_car_numbers_sorting(self):
         """Test that duplicate car numbers are handled correctly in sorting"""
@@ -173,29 +134,12 @@ class SortOrderTestCase(unittest.TestCase):
             ("Alice", "Brown", "14", 14),  # Duplicate car number
         ]
 
-        for first_name, last_name, car_number, sort_order in test_data:
-            self.cursor.execute(
-                """
-                INSERT INTO car_registrations 
-                (first_name, last_name, car_number, sort_order, car_make, car_model, car_year, car_color, reserved_date, notes)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """,
-                (
-                    first_name,
-                    last_name,
-                    car_number,
-                    sort_order,
-                    "Test",
-                    "Model",
-                    2020,
-                    "Red",
-                    None,
-                    "Test note",
-                ),
+        with self.db_conn:
+            self.cursor.executemany(
+                _INSERT_SQL,
+                [(*registration, *_CAR_DETAILS) for registration in test_data],
             )
 
-        self.db_conn.commit()
-
         # Query with ORDER BY sort_order, car_number
         self.cursor.execute(
             """
@@ -206,43 +150,44 @@ class SortOrderTestCase(unittest.TestCase):
         )
         results = self.cursor.fetchall()
 
-        # Should have 4 results, sorted by sort_order first, then car_number
-        self.assertEqual(len(results), 4)
+        # Should have 4 results, sorted by sort_order first, then car_number.
+        # The index keeps duplicates in insertion (rowid) order, which the
+        # stable sort below preserves as well.
+        expected = sorted(
+            (
+                (car_number, sort_order, first_name, last_name)
+                for first_name, last_name, car_number, sort_order in test_data
+            ),
+            key=lambda row: (row[1], row[0]),
+        )
+        self.assertEqual(results, expected)
+
+    def test_order_by_uses_index(self):
+        """Test that ORDER BY sort_order, car_number is served by an index"""
+        with self.db_conn:
+            self.cursor.executemany(
+                _INSERT_SQL,
+                [
+                    ("John", "Doe", "14", 14, *_CAR_DETAILS),
+                    ("Jane", "Smith", "1", 1, *_CAR_DETAILS),
+                ],
+            )
+        # Plan against real statistics rather than SQLite's default estimates
+        self.cursor.execute("ANALYZE")
 
-        # First two should be car_number "1" (sort_order 1)
-        self.assertEqual(results[0][0], "1")  # car_number
-        self.assertEqual(results[0][1], 1)  # sort_order
-        self.assertEqual(results[1][0], "1")  # car_number
-        self.assertEqual(results[1][1], 1)  # sort_order
+        self.cursor.execute(
+            "EXPLAIN QUERY PLAN "
+            "SELECT * FROM car_registrations ORDER BY sort_order, car_number"
+        )
+        plan = " ".join(row[-1] for row in self.cursor.fetchall())
 
-        # Last two should be car_number "14" (sort_order 14)
-        self.assertEqual(results[2][0], "14")  # car_number
-        self.assertEqual(results[2][1], 14)  # sort_order
-        self.assertEqual(results[3][0], "14")  # car_number
-        self.assertEqual(results[3][1], 14)  # sort_order
+        self.assertIn("idx_sort_order_car_number", plan)
+        self.assertNotIn("USE TEMP B-TREE", plan)
 
     def test_invalid_car_number_sort_order(self):
         """Test that invalid car numbers get sort_order 0"""
         # Insert registration with invalid car number
-        self.cursor.execute(
-            """
-            INSERT INTO car_registrations 
-            (first_name, last_name, car_number, sort_order, car_make, car_model, car_year, car_color, reserved_date, notes)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        """,
-            (
-                "Test",
-                "User",
-                "invalid",
-                0,
-                "Test",
-                "Model",
-                2020,
-                "Red",
-                None,
-                "Test note",
-            ),
-        )
+        self.cursor.execute(_INSERT_SQL, ("Test", "User", "invalid", 0, *_CAR_DETAILS))
 
         self.db_conn.commit()
 
@@ -258,14 +203,7 @@ class SortOrderTestCase(unittest.TestCase):
     def test_sort_order_update_on_edit(self):
         """Test that sort_order is updated when car_number is changed"""
         # Insert initial registration
-        self.cursor.execute(
-            """
-            INSERT INTO car_registrations 
-            (first_name, last_name, car_number, sort_order, car_make, car_model, car_year, car_color, reserved_date, notes)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        """,
-            ("John", "Doe", "1", 1, "Test", "Model", 2020, "Red", None, "Test note"),
-        )
+        self.cursor.execute(_INSERT_SQL, ("John", "Doe", "1", 1, *_CAR_DETAILS))
 
         self.db_conn.commit()
 
@@ -1,127 +1,119 @@
 import unittest
-import tempfile
-import os
 import sqlite3
 from datetime import datetime
+from unittest import mock
 from app import (
+    app,
     init_db,
     calculate_expiration_date,
     update_usage_for_registration,
+    update_usage_for_registrations,
     remove_usage_for_registration,
 )
 
+from tests._db import copy_to_memory, maybe_trace, memory_db_uri
+
+
+# One string object per INSERT shape so sqlite3's statement cache reuses the
+# prepared statement across tests
+_INSERT_SQL = (
+    "INSERT INTO car_registrations "
+    "(first_name, last_name, car_number, sort_order, car_make, car_model, "
+    "car_year, car_color, reserved_date, notes) "
+    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)"
+)
+
+_INSERT_WITH_USAGE_SQL = (
+    "INSERT INTO car_registrations "
+    "(first_name, last_name, car_number, sort_order, car_make, car_model, "
+    "car_year, car_color, reserved_date, notes, last_usage_year, usage_count) "
+    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)"
+)
+
 
 class UtilsTestCase(unittest.TestCase):
     """Test cases for utility functions"""
 
+    @classmethod
+    def setUpClass(cls):
+        """Build the schema once into a template database"""
+        template_path = memory_db_uri("template")
+        cls.template_conn = sqlite3.connect(template_path, uri=True)
+        cls.addClassCleanup(cls.template_conn.close)
+        init_db(template_path)
+
     def setUp(self):
         """Set up test database before each test"""
-        self.db_fd, self.db_path = tempfile.mkstemp()
-        init_db(self.db_path)
-
-    def tearDown(self):
-        """Clean up after each test"""
-        os.close(self.db_fd)
-        os.unlink(self.db_path)
+        # One connection per test for every fixture insert and verification query
+        self.db_path, self.conn = copy_to_memory(self, self.template_conn)
+        maybe_trace(self.conn)
+        self.cursor = self.conn.cursor()
+        # Point the usage helpers at this test's database, restoring the
+        # previous setting afterwards so no other test sees it
+        self.enterContext(mock.patch.dict(app.config, {"DATABASE": self.db_path}))
 
     def test_calculate_expiration_date_basic(self):
         """Test basic expiration date calculation"""
-        # Test with usage
-        expiration_date, is_active = calculate_expiration_date("2022-01-15", 2025)
-        self.assertEqual(expiration_date, "2028-01-01")
-        self.assertTrue(is_active)
+        cases = [
+            ("2022-01-15", 2025, ("2028-01-01", True)),  # with usage
+            ("2022-01-15", None, ("2025-01-01", True)),  # without usage
+        ]
 
-        # Test without usage
-        expiration_date, is_active = calculate_expiration_date("2022-01-15", None)
-        self.assertEqual(expiration_date, "2025-01-01")
-        self.assertTrue(is_active)
+        self.assertEqual(
+            [calculate_expiration_date(date, usage) for date, usage, _ in cases],
+            [expected for *_, expected in cases],
+        )
 
     def test_calculate_expiration_date_edge_cases(self):
         """Test expiration date calculation edge cases"""
-        # Test with very old reservation
-        expiration_date, is_active = calculate_expiration_date("1959-03-28", None)
-        self.assertEqual(expiration_date, "1962-01-01")
-        self.assertFalse(is_active)
-
-        # Test with future reservation
-        future_year = datetime.now().year + 5
-        expiration_date, is_active = calculate_expiration_date(
-            f"{future_year}-01-01", None
-        )
-        expected_expiration = f"{future_year + 3}-01-01"
-        self.assertEqual(expiration_date, expected_expiration)
-        self.assertTrue(is_active)
-
-        # Test with current year usage
         current_year = datetime.now().year
-        expiration_date, is_active = calculate_expiration_date(
-            "2022-01-15", current_year
+        future_year = current_year + 5
+        cases = [
+            # Very old reservation
+            ("1959-03-28", None, ("1962-01-01", False)),
+            # Future reservation
+            (f"{future_year}-01-01", None, (f"{future_year + 3}-01-01", True)),
+            # Current year usage
+            ("2022-01-15", current_year, (f"{current_year + 3}-01-01", True)),
+        ]
+
+        self.assertEqual(
+            [calculate_expiration_date(date, usage) for date, usage, _ in cases],
+            [expected for *_, expected in cases],
         )
-        expected_expiration = f"{current_year + 3}-01-01"
-        self.assertEqual(expiration_date, expected_expiration)
-        self.assertTrue(is_active)
 
     def test_calculate_expiration_date_invalid_inputs(self):
         """Test expiration date calculation with invalid inputs"""
-        # Test with invalid date format
-        expiration_date, is_active = calculate_expiration_date("invalid-date", None)
-        self.assertIsNone(expiration_date)
-        self.assertFalse(is_active)
-
-        # Test with None date
-        expiration_date, is_active = calculate_expiration_date(None, None)
-        self.assertIsNone(expiration_date)
-        self.assertFalse(is_active)
+        # Invalid date format, None date and empty string
+        dates = ["invalid-date", None, ""]
 
-        # Test with empty string
-        expiration_date, is_active = calculate_expiration_date("", None)
-        self.assertIsNone(expiration_date)
-        self.assertFalse(is_active)
+        self.assertEqual(
+            [calculate_expiration_date(date, None) for date in dates],
+            [(None, False)] * len(dates),
+        )
 
     def test_calculate_expiration_date_different_formats(self):
         """Test expiration date calculation with different date formats"""
         # Test with different valid date formats
-        test_cases = [
-            (
-                "2022-01-15",
-                2025,
-                "2028-01-01",
-            ),  # 2025 usage extends 2025 expiration to 2028
-            (
-                "2023-06-30",
-                2024,
-                "2029-01-01",
-            ),  # 2024 usage extends 2026 expiration to 2029
-            (
-                "2021-12-31",
-                2026,
-                "2030-01-01",
-            ),  # 2026 usage extends 2024 expiration to 2030
+        cases = [
+            # 2025 usage extends 2025 expiration to 2028
+            ("2022-01-15", 2025, ("2028-01-01", True)),
+            # 2024 usage extends 2026 expiration to 2029
+            ("2023-06-30", 2024, ("2029-01-01", True)),
+            # 2026 usage extends 2024 expiration to 2030
+            ("2021-12-31", 2026, ("2030-01-01", True)),
         ]
 
-        for reserved_date, usage_year, expected_expiration in test_cases:
-            expiration_date, is_active = calculate_expiration_date(
-                reserved_date, usage_year
-            )
-            self.assertEqual(expiration_date, expected_expiration)
-            self.assertTrue(is_active)
+        self.assertEqual(
+            [calculate_expiration_date(date, usage) for date, usage, _ in cases],
+            [expected for *_, expected in cases],
+        )
 
     def test_update_usage_for_registration_basic(self):
         """Test basic usage update functionality"""
-        # Set up the database path for the function
-        import app
-
-        app.app.config["DATABASE"] = self.db_path
-
         # Insert test registration
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        cursor.execute(
-            """
-            INSERT INTO car_registrations 
-            (first_name, last_name, car_number, sort_order, car_make, car_model, car_year, car_color, reserved_date, notes)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        """,
+        self.cursor.execute(
+            _INSERT_SQL,
             (
                 "John",
                 "Doe",
@@ -135,22 +127,11 @@ class UtilsTestCase(unittest.TestCase):
                 "Test",
             ),
         )
-        conn.commit()
-        conn.close()
+        self.conn.commit()
 
-        # Update usage
-        success = update_usage_for_registration(1, 2025)
-        self.assertTrue(success)
-
-        # Verify the update
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        cursor.execute(
-            "SELECT last_usage_year, usage_count, expiration_date, is_active_in_period FROM car_registrations WHERE id = ?",
-            (1,),
-        )
-        result = cursor.fetchone()
-        conn.close()
+        # Update usage; the stored values come back from the UPDATE itself
+        result = update_usage_for_registration(1, 2025)
+        self.assertTrue(result)
 
         self.assertEqual(result[0], 2025)  # last_usage_year
         self.assertEqual(result[1], 1)  # usage_count
@@ -159,20 +140,9 @@ class UtilsTestCase(unittest.TestCase):
 
     def test_update_usage_for_registration_multiple_updates(self):
         """Test multiple usage updates"""
-        # Set up the database path for the function
-        import app
-
-        app.app.config["DATABASE"] = self.db_path
-
         # Insert test registration
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        cursor.execute(
-            """
-            INSERT INTO car_registrations 
-            (first_name, last_name, car_number, sort_order, car_make, car_model, car_year, car_color, reserved_date, notes)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        """,
+        self.cursor.execute(
+            _INSERT_SQL,
             (
                 "John",
                 "Doe",
@@ -186,23 +156,17 @@ class UtilsTestCase(unittest.TestCase):
                 "Test",
             ),
         )
-        conn.commit()
-        conn.close()
+        self.conn.commit()
 
-        # Update usage multiple times
-        update_usage_for_registration(1, 2024)
-        update_usage_for_registration(1, 2025)
-        update_usage_for_registration(1, 2026)
+        # Update usage multiple times in one transaction
+        success = update_usage_for_registrations([(1, 2024), (1, 2025), (1, 2026)])
+        self.assertTrue(success)
 
         # Verify final state
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        cursor.execute(
+        result = self.cursor.execute(
             "SELECT last_usage_year, usage_count, expiration_date FROM car_registrations WHERE id = ?",
             (1,),
-        )
-        result = cursor.fetchone()
-        conn.close()
+        ).fetchone()
 
         self.assertEqual(result[0], 2026)  # last_usage_year (should be the latest)
         self.assertEqual(result[1], 3)  # usage_count (should be incremented)
@@ -210,32 +174,121 @@ class UtilsTestCase(unittest.TestCase):
             result[2], "2031-01-01"
         )  # expiration_date (based on latest usage)
 
-    def test_update_usage_for_registration_nonexistent(self):
-        """Test updating usage for non-existent registration"""
-        # Set up the database path for the function
-        import app
+    def test_update_usage_for_registrations_updates_each_row(self):
+        """Test that a batch writes every usage column of each registration"""
+        for first_name, car_number, reserved_date in (
+            ("John", "101", "2022-01-15"),
+            ("Jane", "102", "2020-06-01"),
+        ):
+            self.cursor.execute(
+                _INSERT_SQL,
+                (
+                    first_name,
+                    "Doe",
+                    car_number,
+                    int(car_number),
+                    "BMW",
+                    "M3",
+                    2020,
+                    "Black",
+                    reserved_date,
+                    "Test",
+                ),
+            )
+        self.conn.commit()
+
+        success = update_usage_for_registrations([(1, 2025), (2, 2021)])
+        self.assertTrue(success)
+
+        rows = self.cursor.execute(
+            """
+            SELECT id, last_usage_year, usage_count, expiration_date, is_active_in_period
+            FROM car_registrations ORDER BY id
+        """
+        ).fetchall()
+        expected = []
+        for registration_id, reserved_date, usage_year in (
+            (1, "2022-01-15", 2025),
+            (2, "2020-06-01", 2021),
+        ):
+            expiration_date, is_active = calculate_expiration_date(
+                reserved_date, usage_year
+            )
+            expected.append(
+                (registration_id, usage_year, 1, expiration_date, is_active)
+            )
+        self.assertEqual(rows, expected)
+
+    def test_update_usage_for_registrations_nonexistent(self):
+        """Test that a batch with an unknown registration records nothing"""
+        self.cursor.execute(
+            _INSERT_SQL,
+            (
+                "John",
+                "Doe",
+                "101",
+                101,
+                "BMW",
+                "M3",
+                2020,
+                "Black",
+                "2022-01-15",
+                "Test",
+            ),
+        )
+        self.conn.commit()
+
+        success = update_usage_for_registrations([(1, 2025), (999, 2025)])
+        self.assertFalse(success)
+
+        result = self.cursor.execute(
+            "SELECT usage_count FROM car_registrations WHERE id = ?", (1,)
+        ).fetchone()
+        self.assertEqual(result[0], 0)
+
+    def test_update_usage_for_registrations_empty(self):
+        """Test that an empty batch succeeds without touching the database"""
+        self.assertTrue(update_usage_for_registrations([]))
+
+    def test_update_usage_for_registrations_default_year(self):
+        """Test that a None usage year in a batch means the current year"""
+        self.cursor.execute(
+            _INSERT_SQL,
+            (
+                "John",
+                "Doe",
+                "101",
+                101,
+                "BMW",
+                "M3",
+                2020,
+                "Black",
+                "2022-01-15",
+                "Test",
+            ),
+        )
+        self.conn.commit()
+
+        success = update_usage_for_registrations([(1, None)])
+        self.assertTrue(success)
 
-        app.app.config["DATABASE"] = self.db_path
+        result = self.cursor.execute(
+            "SELECT last_usage_year, usage_count FROM car_registrations WHERE id = ?",
+            (1,),
+        ).fetchone()
+        self.assertEqual(result[0], datetime.now().year)
+        self.assertEqual(result[1], 1)
 
+    def test_update_usage_for_registration_nonexistent(self):
+        """Test updating usage for non-existent registration"""
         success = update_usage_for_registration(999, 2025)
         self.assertFalse(success)
 
     def test_update_usage_for_registration_default_year(self):
         """Test updating usage with default year (current year)"""
-        # Set up the database path for the function
-        import app
-
-        app.app.config["DATABASE"] = self.db_path
-
         # Insert test registration
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        cursor.execute(
-            """
-            INSERT INTO car_registrations 
-            (first_name, last_name, car_number, sort_order, car_make, car_model, car_year, car_color, reserved_date, notes)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        """,
+        self.cursor.execute(
+            _INSERT_SQL,
             (
                 "John",
                 "Doe",
@@ -249,8 +302,7 @@ class UtilsTestCase(unittest.TestCase):
                 "Test",
             ),
         )
-        conn.commit()
-        conn.close()
+        self.conn.commit()
 
         # Update usage with default year
         current_year = datetime.now().year
@@ -258,32 +310,17 @@ class UtilsTestCase(unittest.TestCase):
         self.assertTrue(success)
 
         # Verify the update
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        cursor.execute(
+        result = self.cursor.execute(
             "SELECT last_usage_year FROM car_registrations WHERE id = ?", (1,)
-        )
-        result = cursor.fetchone()
-        conn.close()
+        ).fetchone()
 
         self.assertEqual(result[0], current_year)
 
     def test_remove_usage_for_registration_basic(self):
         """Test basic usage removal functionality"""
-        # Set up the database path for the function
-        import app
-
-        app.app.config["DATABASE"] = self.db_path
-
         # Insert test registration with usage
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        cursor.execute(
-            """
-            INSERT INTO car_registrations 
-            (first_name, last_name, car_number, sort_order, car_make, car_model, car_year, car_color, reserved_date, notes, last_usage_year, usage_count)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        """,
+        self.cursor.execute(
+            _INSERT_WITH_USAGE_SQL,
             (
                 "John",
                 "Doe",
@@ -299,22 +336,17 @@ class UtilsTestCase(unittest.TestCase):
                 1,
             ),
         )
-        conn.commit()
-        conn.close()
+        self.conn.commit()
 
         # Remove usage
         success = remove_usage_for_registration(1)
         self.assertTrue(success)
 
         # Verify the removal
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        cursor.execute(
+        result = self.cursor.execute(
             "SELECT last_usage_year, usage_count, expiration_date, is_active_in_period FROM car_registrations WHERE id = ?",
             (1,),
-        )
-        result = cursor.fetchone()
-        conn.close()
+        ).fetchone()
 
         self.assertIsNone(result[0])  # last_usage_year should be None
         self.assertEqual(result[1], 0)  # usage_count should be 0
@@ -325,30 +357,14 @@ class UtilsTestCase(unittest.TestCase):
 
     def test_remove_usage_for_registration_nonexistent(self):
         """Test removing usage for non-existent registration"""
-        # Set up the database path for the function
-        import app
-
-        app.app.config["DATABASE"] = self.db_path
-
         success = remove_usage_for_registration(999)
         self.assertFalse(success)
 
     def test_remove_usage_for_registration_no_usage(self):
         """Test removing usage when no usage exists"""
-        # Set up the database path for the function
-        import app
-
-        app.app.config["DATABASE"] = self.db_path
-
         # Insert test registration without usage
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        cursor.execute(
-            """
-            INSERT INTO car_registrations 
-            (first_name, last_name, car_number, sort_order, car_make, car_model, car_year, car_color, reserved_date, notes)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        """,
+        self.cursor.execute(
+            _INSERT_SQL,
             (
                 "John",
                 "Doe",
@@ -362,42 +378,26 @@ class UtilsTestCase(unittest.TestCase):
                 "Test",
             ),
         )
-        conn.commit()
-        conn.close()
+        self.conn.commit()
 
         # Remove usage (should still work)
         success = remove_usage_for_registration(1)
         self.assertTrue(success)
 
         # Verify state remains the same
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        cursor.execute(
+        result = self.cursor.execute(
             "SELECT last_usage_year, usage_count FROM car_registrations WHERE id = ?",
             (1,),
-        )
-        result = cursor.fetchone()
-        conn.close()
+        ).fetchone()
 
         self.assertIsNone(result[0])  # last_usage_year should still be None
         self.assertEqual(result[1], 0)  # usage_count should still be 0
 
     def test_usage_lifecycle(self):
         """Test complete usage lifecycle: add, update, remove"""
-        # Set up the database path for the function
-        import app
-
-        app.app.config["DATABASE"] = self.db_path
-
         # Insert test registration
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        cursor.execute(
-            """
-            INSERT INTO car_registrations 
-            (first_name, last_name, car_number, sort_order, car_make, car_model, car_year, car_color, reserved_date, notes)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        """,
+        self.cursor.execute(
+            _INSERT_SQL,
             (
                 "John",
                 "Doe",
@@ -411,76 +411,34 @@ class UtilsTestCase(unittest.TestCase):
                 "Test",
             ),
         )
-        conn.commit()
-        conn.close()
+        self.conn.commit()
 
-        # Step 1: Add usage
-        success = update_usage_for_registration(1, 2024)
-        self.assertTrue(success)
-
-        # Verify usage added
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        cursor.execute(
-            "SELECT last_usage_year, usage_count FROM car_registrations WHERE id = ?",
-            (1,),
-        )
-        result = cursor.fetchone()
-        conn.close()
+        # Step 1: Add usage, verifying the values the helper returns
+        result = update_usage_for_registration(1, 2024)
+        self.assertTrue(result)
 
         self.assertEqual(result[0], 2024)
         self.assertEqual(result[1], 1)
 
-        # Step 2: Update usage
-        success = update_usage_for_registration(1, 2025)
-        self.assertTrue(success)
-
-        # Verify usage updated
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        cursor.execute(
-            "SELECT last_usage_year, usage_count FROM car_registrations WHERE id = ?",
-            (1,),
-        )
-        result = cursor.fetchone()
-        conn.close()
+        # Step 2: Update usage, verifying the values the helper returns
+        result = update_usage_for_registration(1, 2025)
+        self.assertTrue(result)
 
         self.assertEqual(result[0], 2025)
         self.assertEqual(result[1], 2)
 
-        # Step 3: Remove usage
-        success = remove_usage_for_registration(1)
-        self.assertTrue(success)
-
-        # Verify usage removed
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        cursor.execute(
-            "SELECT last_usage_year, usage_count FROM car_registrations WHERE id = ?",
-            (1,),
-        )
-        result = cursor.fetchone()
-        conn.close()
+        # Step 3: Remove usage, verifying the values the helper returns
+        result = remove_usage_for_registration(1)
+        self.assertTrue(result)
 
         self.assertIsNone(result[0])
         self.assertEqual(result[1], 0)
 
     def test_expiration_date_recalculation(self):
         """Test that expiration dates are recalculated correctly"""
-        # Set up the database path for the function
-        import app
-
-        app.app.config["DATABASE"] = self.db_path
-
         # Insert test registration
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        cursor.execute(
-            """
-            INSERT INTO car_registrations 
-            (first_name, last_name, car_number, sort_order, car_make, car_model, car_year, car_color, reserved_date, notes)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        """,
+        self.cursor.execute(
+            _INSERT_SQL,
             (
                 "John",
                 "Doe",
@@ -494,17 +452,12 @@ class UtilsTestCase(unittest.TestCase):
                 "Test",
             ),
         )
-        conn.commit()
-        conn.close()
+        self.conn.commit()
 
         # Check initial expiration date (no usage) - should be None since not calculated during direct DB insertion
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        cursor.execute(
+        result = self.cursor.execute(
             "SELECT expiration_date FROM car_registrations WHERE id = ?", (1,)
-        )
-        result = cursor.fetchone()
-        conn.close()
+        ).fetchone()
 
         self.assertIsNone(
             result[0]
@@ -513,112 +466,74 @@ class UtilsTestCase(unittest.TestCase):
         # Add usage and check expiration date
         update_usage_for_registration(1, 2025)
 
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        cursor.execute(
+        result = self.cursor.execute(
             "SELECT expiration_date FROM car_registrations WHERE id = ?", (1,)
-        )
-        result = cursor.fetchone()
-        conn.close()
+        ).fetchone()
 
         self.assertEqual(result[0], "2028-01-01")  # 3 years from usage date
 
         # Remove usage and check expiration date
         remove_usage_for_registration(1)
 
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        cursor.execute(
+        result = self.cursor.execute(
             "SELECT expiration_date FROM car_registrations WHERE id = ?", (1,)
-        )
-        result = cursor.fetchone()
-        conn.close()
+        ).fetchone()
 
         self.assertEqual(result[0], "2025-01-01")  # Back to 3 years from reserved date
 
     def test_is_active_in_period_calculation(self):
         """Test that is_active_in_period is calculated correctly"""
-        # Set up the database path for the function
-        import app
-
-        app.app.config["DATABASE"] = self.db_path
-
-        # Test with current year reservation (should be active)
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        # Insert a current year reservation (should be active) and an old one
+        # (should be expired after usage update) in one batch
         current_year = datetime.now().year
-        cursor.execute(
-            """
-            INSERT INTO car_registrations 
-            (first_name, last_name, car_number, sort_order, car_make, car_model, car_year, car_color, reserved_date, notes)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        """,
-            (
-                "John",
-                "Doe",
-                "101",
-                101,
-                "BMW",
-                "M3",
-                2020,
-                "Black",
-                f"{current_year}-01-15",
-                "Test",
-            ),
+        old_year = current_year - 10
+        self.cursor.executemany(
+            _INSERT_SQL,
+            [
+                (
+                    "John",
+                    "Doe",
+                    "101",
+                    101,
+                    "BMW",
+                    "M3",
+                    2020,
+                    "Black",
+                    f"{current_year}-01-15",
+                    "Test",
+                ),
+                (
+                    "Jane",
+                    "Smith",
+                    "102",
+                    102,
+                    "Porsche",
+                    "911",
+                    2020,
+                    "Red",
+                    f"{old_year}-01-15",
+                    "Test",
+                ),
+            ],
         )
-        conn.commit()
-        conn.close()
+        self.conn.commit()
 
         # Should be active (default value)
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        cursor.execute(
+        result = self.cursor.execute(
             "SELECT is_active_in_period FROM car_registrations WHERE id = ?", (1,)
-        )
-        result = cursor.fetchone()
-        conn.close()
+        ).fetchone()
 
         self.assertTrue(result[0])  # Default value is True
 
-        # Test with old reservation (should be expired after usage update)
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        old_year = current_year - 10
-        cursor.execute(
-            """
-            INSERT INTO car_registrations 
-            (first_name, last_name, car_number, sort_order, car_make, car_model, car_year, car_color, reserved_date, notes)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        """,
-            (
-                "Jane",
-                "Smith",
-                "102",
-                102,
-                "Porsche",
-                "911",
-                2020,
-                "Red",
-                f"{old_year}-01-15",
-                "Test",
-            ),
-        )
-        conn.commit()
-        conn.close()
-
         # Update usage to trigger expiration calculation - use a year that will make it expired
         update_usage_for_registration(
             2, old_year + 2
         )  # Usage 2 years after reservation
 
         # Should be expired (3 years from usage = old_year + 5, which is less than current_year)
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        cursor.execute(
+        result = self.cursor.execute(
             "SELECT is_active_in_period FROM car_registrations WHERE id = ?", (2,)
-        )
-        result = cursor.fetchone()
-        conn.close()
+        ).fetchone()
 
         self.assertFalse(result[0])  # Should be expired
 